@@ -0,0 +1,25 @@
+from django.contrib import admin
+from changelog.models import ChangeLogEntry
+from stitch_space_api.pagination import EstimatedCountPaginator
+
+
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the change log in the admin interface.
+    """
+    list_display = (
+        'seq', 'kind', 'object_id', 'action', 'profile_id', 'created_at'
+    )
+    list_filter = ('kind', 'action')
+    ordering = ('-seq',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(ChangeLogEntry, ChangeLogEntryAdmin)
@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from changelog.models import ChangeLogEntry
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """
+    Management command to delete change log entries older than a number of
+    days, in bounded batches. Clients that last synced before the oldest
+    remaining entry are told to load everything again.
+    """
+    help = 'Delete change log entries older than --days in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches, to limit database load.'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Entries are only ever appended, so everything up to the newest
+        # expired entry can go
+        last_seq = ChangeLogEntry.objects.filter(
+            created_at__lt=cutoff
+        ).order_by('-seq').values_list('seq', flat=True).first()
+        deleted = 0
+        while last_seq is not None:
+            seqs = list(ChangeLogEntry.objects.filter(
+                seq__lte=last_seq
+            ).order_by('seq').values_list('seq', flat=True)[
+                :options['batch_size']
+            ])
+            if not seqs:
+                break
+            deleted += ChangeLogEntry.objects.filter(
+                seq__gte=seqs[0], seq__lte=seqs[-1]
+            ).delete()[0]
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(f'Deleted {deleted} change log entries.')
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-19 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('piece', 'Piece'), ('comment', 'Comment'), ('rating', 'Rating'), ('follower', 'Follower'), ('profile', 'Profile')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('profile_id', models.BigIntegerField()),
+                ('piece_id', models.BigIntegerField(blank=True, null=True)),
+                ('target_profile_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['seq'],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:56
+
+import changelog.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('changelog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelogentry',
+            name='txid',
+            field=models.BigIntegerField(db_default=changelog.models.CurrentTransactionId(), db_index=True, editable=False, null=True),
+        ),
+    ]
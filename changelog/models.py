@@ -0,0 +1,135 @@
+from django.db import connection, models
+from django.db.models.signals import post_delete, post_save
+
+
+class CurrentTransactionId(models.Func):
+    """
+    The id of the current transaction on PostgreSQL, and NULL on other
+    databases.
+    """
+    output_field = models.BigIntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return 'NULL', []
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return 'pg_current_xact_id()::text::bigint', []
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One create, update or delete of a piece, comment, rating, follow or
+    profile. Entries are written in the transaction of the change they
+    record and `seq` only grows. Related ids are plain integers so entries
+    outlive the rows they describe.
+
+    Seqs are taken before the entries commit, so a transaction still in
+    flight can commit an entry below one already read. Readers follow the
+    log by position instead, see `log_position`.
+    """
+    KINDS = (
+        ('piece', 'Piece'),
+        ('comment', 'Comment'),
+        ('rating', 'Rating'),
+        ('follower', 'Follower'),
+        ('profile', 'Profile'),
+    )
+    ACTIONS = (
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    )
+
+    seq = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    # Profile owning the changed row: the author of a piece, comment or
+    # rating, the follower of a follow, or the profile itself
+    profile_id = models.BigIntegerField()
+    # Piece the changed row belongs to, for pieces, comments and ratings
+    piece_id = models.BigIntegerField(null=True, blank=True)
+    # Followed profile, for follows
+    target_profile_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Transaction that wrote the entry, on PostgreSQL
+    txid = models.BigIntegerField(
+        null=True, editable=False, db_index=True,
+        db_default=CurrentTransactionId()
+    )
+
+    class Meta:
+        ordering = ['seq']
+
+    def __str__(self):
+        return f"{self.seq}: {self.kind} {self.object_id} {self.action}"
+
+
+def log_position():
+    """
+    Return the field giving the position of entries in commit order, and
+    the current horizon: every entry positioned below it is committed and
+    visible, and every entry committed later is positioned at or above it.
+
+    On PostgreSQL positions are transaction ids and the horizon is the
+    oldest transaction still in flight. Other databases, such as SQLite,
+    run one write transaction at a time, so seqs commit in order and the
+    horizon is just past the latest entry.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint'
+            )
+            return 'txid', cursor.fetchone()[0]
+    head = ChangeLogEntry.objects.order_by('-seq').values_list(
+        'seq', flat=True
+    ).first() or 0
+    return 'seq', head + 1
+
+
+def change_entry(kind, instance, action):
+    """
+    Build the unsaved log entry for a change to a model instance.
+    """
+    entry = ChangeLogEntry(kind=kind, object_id=instance.pk, action=action)
+    if kind == 'profile':
+        entry.profile_id = instance.pk
+    elif kind == 'follower':
+        entry.profile_id = instance.follower_id
+        entry.target_profile_id = instance.followed_profile_id
+    else:
+        entry.profile_id = instance.profile_id
+        entry.piece_id = instance.pk if kind == 'piece' else instance.piece_id
+    return entry
+
+
+def record_changes(kind, instances, action):
+    """
+    Log the same change to several instances with a single insert, for
+    writes that bypass model signals such as soft deletes and raw upserts.
+    """
+    ChangeLogEntry.objects.bulk_create(
+        change_entry(kind, instance, action) for instance in instances
+    )
+
+
+def log_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    change_entry(
+        sender._meta.model_name, instance, 'created' if created else 'updated'
+    ).save()
+
+
+def log_delete(sender, instance, **kwargs):
+    change_entry(sender._meta.model_name, instance, 'deleted').save()
+
+
+# Senders are given lazily so the apps being logged can import this module
+for model in (
+    'pieces.Piece', 'pieces.Comment', 'pieces.Rating',
+    'profiles.Follower', 'profiles.Profile',
+):
+    post_save.connect(log_save, sender=model, weak=False)
+    post_delete.connect(log_delete, sender=model, weak=False)
@@ -0,0 +1,133 @@
+from changelog.models import ChangeLogEntry, log_position
+from django.db.models import Q
+from pieces.models import Piece
+from profiles.models import Follower
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+
+def compact_changes(entries):
+    """
+    Reduce log entries, in position order, to one change per object: its net
+    action and the `seq` of its last entry. Objects created and deleted
+    within the entries are dropped altogether.
+    """
+    first_actions = {}
+    latest = {}
+    for entry in entries:
+        key = (entry['kind'], entry['object_id'])
+        first_actions.setdefault(key, entry['action'])
+        latest[key] = entry
+
+    changes = []
+    for key, entry in latest.items():
+        action = entry['action']
+        if first_actions[key] == 'created':
+            if action == 'deleted':
+                continue
+            action = 'created'
+        changes.append({
+            'seq': entry['seq'],
+            'kind': entry['kind'],
+            'id': entry['object_id'],
+            'action': action,
+            'pieceId': entry['piece_id'],
+            'profileId': entry['profile_id'],
+        })
+    changes.sort(key=lambda change: change['seq'])
+    return changes
+
+
+class ChangeListView(generics.GenericAPIView):
+    """
+    API view returning the changes relevant to the authenticated user since
+    the `since` position: their own writes, follows of their profile,
+    comments and ratings on their pieces, and piece and profile changes of
+    the profiles they follow. Changes are compacted to one per object and
+    identify the objects to re-fetch rather than embed them.
+
+    Positions follow the order entries commit in (see `log_position`), so
+    `next` never moves past an entry a transaction in flight may still
+    commit. Without `since` the response only holds the current position,
+    to sync from after a full load. `resync` is true when entries from
+    `since` on have been trimmed and the client has to load everything
+    again.
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 500
+    max_limit = 1000
+
+    def get(self, request):
+        field, horizon = log_position()
+
+        since = request.query_params.get('since')
+        if since is None:
+            return Response({
+                'changes': [],
+                'next': horizon,
+                'hasMore': False,
+                'resync': False,
+            })
+        try:
+            since = int(since)
+            limit = min(
+                int(request.query_params.get('limit', self.default_limit)),
+                self.max_limit
+            )
+        except ValueError:
+            raise ValidationError('since and limit must be integers.')
+        if limit < 1:
+            raise ValidationError('limit must be positive.')
+
+        oldest = ChangeLogEntry.objects.order_by(field).values_list(
+            field, flat=True
+        ).first()
+        if oldest is not None and since < oldest:
+            return Response({
+                'changes': [],
+                'next': horizon,
+                'hasMore': False,
+                'resync': True,
+            })
+
+        profile = request.user.profile
+        followed = Follower.objects.filter(follower=profile).values(
+            'followed_profile'
+        )
+        own_pieces = Piece.all_objects.filter(profile=profile).values('id')
+        relevant = ChangeLogEntry.objects.filter(
+            Q(profile_id=profile.id)
+            | Q(target_profile_id=profile.id)
+            | Q(kind__in=['comment', 'rating'], piece_id__in=own_pieces)
+            | Q(kind__in=['piece', 'profile'], profile_id__in=followed),
+            **{f'{field}__gte': since, f'{field}__lt': horizon}
+        ).order_by(field, 'seq').values(
+            'seq', 'kind', 'object_id', 'action', 'piece_id', 'profile_id',
+            field
+        )
+        entries = list(relevant[:limit + 1])
+
+        has_more = len(entries) > limit
+        if has_more:
+            # Pages end between positions, as a page can't end halfway
+            # through the entries of one transaction
+            next_position = entries[limit][field]
+            entries = [
+                entry for entry in entries if entry[field] < next_position
+            ]
+            if not entries:
+                # A transaction with more entries than the limit is
+                # returned whole
+                entries = list(relevant.filter(**{field: next_position}))
+                next_position += 1
+        else:
+            # Skip past the entries that were irrelevant to this user too
+            next_position = max(horizon, since)
+        return Response({
+            'changes': compact_changes(entries),
+            'next': next_position,
+            'hasMore': has_more,
+            'resync': False,
+        })
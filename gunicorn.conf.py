@@ -0,0 +1,25 @@
+"""
+Gunicorn settings for the web process. The application is loaded once in
+the master and warmed up before any worker is forked, so workers start
+with every module imported and the URL patterns and caches built, in
+memory they share with the master copy-on-write.
+
+Set WARMUP_TYPEAHEAD=0 to leave the typeahead index to be built on each
+worker's first search, e.g. when the catalog makes it slow to build.
+"""
+import os
+
+wsgi_app = 'stitch_space_api.asgi:application'
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+
+
+def when_ready(server):
+    from stitch_space_api.warmup import warm_up
+
+    timings = warm_up(
+        typeahead=os.environ.get('WARMUP_TYPEAHEAD', '1') != '0'
+    )
+    server.log.info('Warmed up: %s', ', '.join(
+        f'{step} {seconds * 1000:.0f}ms' for step, seconds in timings.items()
+    ))
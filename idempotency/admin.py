@@ -0,0 +1,22 @@
+from django.contrib import admin
+from idempotency.models import IdempotencyKey
+
+
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the stored idempotency keys in the admin interface.
+    """
+    list_display = ('key', 'user', 'response_status', 'created_at',
+                    'expires_at')
+    list_select_related = ('user',)
+    search_fields = ('^key',)
+    ordering = ('-created_at',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(IdempotencyKey, IdempotencyKeyAdmin)
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from idempotency.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    """
+    Management command to delete expired idempotency keys in bounded
+    batches. Expired keys are ignored by requests anyway; this keeps the
+    table small.
+    """
+    help = 'Delete expired idempotency keys in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches, to limit database load.'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            ids = list(IdempotencyKey.objects.filter(
+                expires_at__lte=now
+            ).order_by('expires_at').values_list('id', flat=True)[
+                :options['batch_size']
+            ])
+            if not ids:
+                break
+            deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(f'Deleted {deleted} idempotency keys.')
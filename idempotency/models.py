@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """
+    An `Idempotency-Key` sent by a user with a create request, the
+    fingerprint of that request and, once it has been handled, the status
+    and data of its response, replayed to retries until `expires_at`.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    # SHA-256 of the method, path and data of the request
+    fingerprint = models.CharField(max_length=64)
+    # Filled in by the transaction that claimed the key, so committed keys
+    # always have a response
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'key'], name='unique_idempotency_key'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.key}'
@@ -0,0 +1,127 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from idempotency.models import IdempotencyKey
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+
+class Conflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'conflict'
+
+
+def request_fingerprint(request):
+    """
+    Hash the method, path and parsed data of a request, so a key reused
+    for a different request can be told apart from a retry.
+    """
+    data = json.dumps(
+        request.data, sort_keys=True, cls=DjangoJSONEncoder, default=str
+    )
+    return hashlib.sha256(
+        f'{request.method} {request.get_full_path()} {data}'.encode()
+    ).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    View mixin making POST requests idempotent when they carry an
+    `Idempotency-Key` header. The key is claimed in the transaction the
+    request is handled in, together with the response, so a retry gets
+    the stored response replayed without running the write again, and a
+    concurrent duplicate blocks on the key until the first request
+    commits, then gets its response. Requests that fail with an error
+    leave no key behind and can be retried. Keys are per user and kept
+    for `idempotency_ttl`.
+    """
+    idempotency_header = 'Idempotency-Key'
+    idempotency_ttl = timedelta(hours=24)
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if key is None or not request.user.is_authenticated:
+            return super().post(request, *args, **kwargs)
+        if not key or len(key) > 255:
+            raise ValidationError(
+                {self.idempotency_header: 'Must be 1 to 255 characters.'}
+            )
+        fingerprint = request_fingerprint(request)
+
+        # Retries of handled requests are answered with a single read
+        stored = IdempotencyKey.objects.filter(
+            user=request.user, key=key, expires_at__gt=timezone.now()
+        ).first()
+        if stored is not None:
+            return self.replay(stored, fingerprint)
+
+        with transaction.atomic():
+            stored = self.claim_key(request.user, key, fingerprint)
+            if stored is not None:
+                return self.replay(stored, fingerprint)
+
+            response = super().post(request, *args, **kwargs)
+            if response.status_code >= 500:
+                # Roll back the claim along with whatever was written
+                transaction.set_rollback(True)
+                return response
+            IdempotencyKey.objects.filter(user=request.user, key=key).update(
+                response_status=response.status_code,
+                response_data=response.data,
+            )
+        return response
+
+    def replay(self, stored, fingerprint):
+        """
+        Return the stored response of a key, unless it was used for a
+        different request.
+        """
+        if stored.fingerprint != fingerprint:
+            return Response(
+                {'detail': (
+                    f'This {self.idempotency_header} was used with a '
+                    'different request.'
+                )},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        response = Response(
+            stored.response_data, status=stored.response_status
+        )
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    def claim_key(self, user, key, fingerprint):
+        """
+        Insert the key for the user, waiting for a transaction holding the
+        same key to finish first. Returns None once claimed, or the stored
+        key when another request has already been handled with it.
+        """
+        now = timezone.now()
+        # A second attempt follows an expired key's removal, or a claim
+        # that was rolled back while this one waited
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    IdempotencyKey.objects.create(
+                        user=user, key=key, fingerprint=fingerprint,
+                        expires_at=now + self.idempotency_ttl,
+                    )
+                return None
+            except IntegrityError:
+                pass
+            stored = IdempotencyKey.objects.filter(
+                user=user, key=key
+            ).first()
+            if stored is not None and stored.expires_at > now:
+                return stored
+            IdempotencyKey.objects.filter(
+                user=user, key=key, expires_at__lte=now
+            ).delete()
+        raise Conflict(
+            f'This {self.idempotency_header} is in use, try again.'
+        )
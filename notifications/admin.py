@@ -1,5 +1,6 @@
 from django.contrib import admin
 from notifications.models import Notification
+from stitch_space_api.pagination import EstimatedCountPaginator
 
 
 class NotificationAdmin(admin.ModelAdmin):
@@ -15,8 +16,15 @@ class NotificationAdmin(admin.ModelAdmin):
         'created_at'
     )
     list_filter = ('interaction_type', 'created_at')
-    search_fields = ('actor__username', 'recipient__username', 'piece__title')
+    list_select_related = ('actor__owner', 'recipient__owner', 'piece')
+    autocomplete_fields = ('actor', 'recipient', 'piece')
+    search_fields = (
+        '^actor__owner__username', '^recipient__owner__username',
+        '^piece__title'
+    )
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def piece_title(self, obj):
         """
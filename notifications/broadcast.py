@@ -0,0 +1,172 @@
+"""
+In-process publish/subscribe for new notifications. Event stream
+connections subscribe to a recipient profile id and are woken when a
+notification for that profile is committed. Publishing is thread-safe so
+it can be called from synchronous request handlers while subscribers wait
+on the event loop.
+
+Each process runs a single `NotificationListener` thread, started with
+the first subscription, that learns of notifications committed by every
+process and publishes them. On PostgreSQL it listens for the NOTIFY sent
+by the transaction creating the notification; on other databases it polls
+for new notification ids.
+"""
+import asyncio
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import connections
+from django.db.models import Max
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL NOTIFY channel, with '<recipient id>:<notification id>' payloads
+CHANNEL = 'notifications'
+
+
+class NotificationBroadcaster:
+    """
+    Maps recipient profile ids to the queues of the connections listening
+    for them. Only the notification id is published; subscribers read the
+    rows themselves so a burst of notifications costs one query.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def subscribe(self, recipient_id):
+        """
+        Register a queue for the recipient on the running event loop and
+        return it. Must be called from a coroutine.
+        """
+        listener.start()
+        queue = asyncio.Queue()
+        subscription = (asyncio.get_running_loop(), queue)
+        with self.lock:
+            self.subscribers[recipient_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, recipient_id, subscription):
+        with self.lock:
+            subscriptions = self.subscribers.get(recipient_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscribers[recipient_id]
+
+    def publish(self, recipient_id, notification_id):
+        """
+        Wake every connection listening for the recipient. Safe to call
+        from any thread.
+        """
+        with self.lock:
+            subscriptions = list(self.subscribers.get(recipient_id, ()))
+        self.wake(subscriptions, notification_id)
+
+    def publish_all(self):
+        """
+        Wake every connection, so each reads what it may have missed.
+        """
+        with self.lock:
+            subscriptions = [
+                subscription
+                for subscriptions in self.subscribers.values()
+                for subscription in subscriptions
+            ]
+        self.wake(subscriptions, None)
+
+    def wake(self, subscriptions, notification_id):
+        for loop, queue in subscriptions:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, notification_id)
+            except RuntimeError:
+                # The connection's event loop has already closed
+                pass
+
+
+class NotificationListener:
+    """
+    Daemon thread publishing the notifications committed by any process to
+    the broadcaster, with one database connection for the whole process.
+    """
+    # Seconds between polls on databases without LISTEN/NOTIFY
+    poll_interval = 2
+    # Seconds to wait before reconnecting after a database error
+    retry_interval = 5
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name='notification-listener',
+                    daemon=True
+                )
+                self.thread.start()
+
+    def run(self):
+        # The thread's own connection is the only one the listener uses
+        connection = connections['default']
+        while True:
+            try:
+                if connection.vendor == 'postgresql':
+                    self.listen(connection)
+                else:
+                    self.poll(connection)
+            except Exception:
+                logger.exception('Notification listener failed')
+            finally:
+                connection.close()
+            time.sleep(self.retry_interval)
+
+    def listen(self, connection):
+        """
+        LISTEN on the notification channel and publish every payload.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {CHANNEL}')
+        # Streams may have missed notifications while nothing listened
+        broadcaster.publish_all()
+        raw = connection.connection
+        while True:
+            if select.select([raw], [], [], 60) == ([], [], []):
+                continue
+            raw.poll()
+            while raw.notifies:
+                payload = raw.notifies.pop(0).payload
+                recipient_id, notification_id = map(int, payload.split(':'))
+                broadcaster.publish(recipient_id, notification_id)
+
+    def poll(self, connection):
+        """
+        Publish the notifications created since the previous poll, reading
+        them every `poll_interval` seconds and closing the connection in
+        between.
+        """
+        Notification = apps.get_model('notifications', 'Notification')
+        last_id = Notification.objects.aggregate(
+            last_id=Max('id')
+        )['last_id'] or 0
+        broadcaster.publish_all()
+        while True:
+            connection.close()
+            time.sleep(self.poll_interval)
+            new = Notification.objects.filter(id__gt=last_id).order_by('id')
+            for recipient_id, notification_id in new.values_list(
+                'recipient_id', 'id'
+            ):
+                broadcaster.publish(recipient_id, notification_id)
+                last_id = notification_id
+
+
+broadcaster = NotificationBroadcaster()
+listener = NotificationListener()
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models.signals import post_save
+from notifications.broadcast import CHANNEL, broadcaster
 from profiles.models import Profile
 from pieces.models import Piece
 
@@ -23,7 +25,7 @@ class Notification(models.Model):
                                 related_name='notification_receiver')
     interaction_type = models.CharField(max_length=50,
                                         choices=INTERACTION_TYPES)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         """
@@ -47,3 +49,24 @@ class Notification(models.Model):
         else:
             piece_title = self.piece.title
             return f"{actor_first_name} {interaction_display} '{piece_title}'"
+
+
+def publish_notification(sender, instance, created, using, **kwargs):
+    # Wake the recipient's open event streams once the row is visible to
+    # their connections. PostgreSQL delivers the NOTIFY to the listener of
+    # every process when the transaction commits.
+    if not created:
+        return
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [
+                CHANNEL, f'{instance.recipient_id}:{instance.id}'
+            ])
+    else:
+        transaction.on_commit(lambda: broadcaster.publish(
+            instance.recipient_id, instance.id
+        ), using=using)
+
+
+post_save.connect(publish_notification, sender=Notification)
@@ -2,20 +2,21 @@ from notifications.models import Notification
 from pieces.models import Piece
 from pieces.serializers import PieceSerializer
 from profiles.models import Profile
-from profiles.serializers import ProfileSerializer
+from profiles.serializers import ProfileCardListSerializer, ProfileSerializer
 from rest_framework import serializers
+from stitch_space_api.fieldsets import SparseFieldsetMixin
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetMixin,
+                             serializers.ModelSerializer):
     """
     Converts Notification objects into a format suitable for API responses.
     It provides additional related data for the associated 'piece', 'actor',
-    and 'recipient' fields using custom methods to include nested data from
-    other models such as `Piece` and `Profile`.
+    and 'recipient' fields as nested `Piece` and `Profile` data.
     """
-    piece = serializers.SerializerMethodField()
-    actor = serializers.SerializerMethodField()
-    recipient = serializers.SerializerMethodField()
+    piece = PieceSerializer(read_only=True)
+    actor = ProfileSerializer(read_only=True)
+    recipient = ProfileSerializer(read_only=True)
     interactionType = serializers.CharField(source='interaction_type')
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
 
@@ -24,18 +25,4 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'piece', 'actor', 'recipient', 'interactionType', 'createdAt'
         ]
-
-    def get_piece(self, obj):
-        if hasattr(obj, 'piece') and obj.piece:
-            return PieceSerializer(obj.piece).data
-        return None
-
-    def get_actor(self, obj):
-        if hasattr(obj, 'actor') and obj.actor:
-            return ProfileSerializer(obj.actor).data
-        return None
-
-    def get_recipient(self, obj):
-        if hasattr(obj, 'recipient') and obj.recipient:
-            return ProfileSerializer(obj.recipient).data
-        return None
+        list_serializer_class = ProfileCardListSerializer
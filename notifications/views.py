@@ -1,13 +1,30 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
+from notifications.broadcast import broadcaster
 from notifications.models import Notification
 from rest_framework import generics, filters
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
 from notifications.serializers import NotificationSerializer
 from profiles.models import Profile
 from rest_framework.permissions import IsAuthenticated
-from django.http import Http404
+from django.db import connection
+from django.db.models import Max
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views import View
+from stitch_space_api.compact import CompactListMixin
+from stitch_space_api.fieldsets import SparseFieldsetViewMixin
+from stitch_space_api.throttling import TokenBucketThrottle
 
 
-class NotificationListByProfileView(generics.ListAPIView):
+class NotificationListByProfileView(CompactListMixin,
+                                    SparseFieldsetViewMixin,
+                                    generics.ListAPIView):
     """
     API view to list notifications for a specific profile, using
     `NotificationSerializer`. Filters notifications where the specified
@@ -17,6 +34,8 @@ class NotificationListByProfileView(generics.ListAPIView):
     """
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'notifications'
     filter_backends = [filters.OrderingFilter]
     ordering_fields = '__all__'
     ordering = ['-created_at']
@@ -32,9 +51,12 @@ class NotificationListByProfileView(generics.ListAPIView):
             raise Http404("Profile does not exist")
 
         # Filter the notifications for the given profile (as recipient)
-        return Notification.objects.filter(
-            recipient=profile
-        ).order_by('-created_at')
+        return self.sparse_queryset(Notification.objects.filter(
+            recipient=profile, actor__deleted_at__isnull=True,
+            piece__deleted_at__isnull=True
+        ).select_related(
+            'piece__profile__owner', 'actor__owner', 'recipient__owner'
+        ).order_by('-created_at'))
 
 
 class NotificationCreateView(generics.CreateAPIView):
@@ -53,3 +75,137 @@ class NotificationCreateView(generics.CreateAPIView):
         """
         # No sender field added directly here because it's triggered elsewhere
         serializer.save()
+
+
+class NotificationStreamView(View):
+    """
+    Server-Sent Events stream of a profile's new notifications, for the
+    profile's owner. Connections wait on the in-process broadcaster, which
+    the process's single notification listener wakes for notifications
+    created by any process, and only read the database when woken. Reads
+    run on pooled threads and close their database connection, so an idle
+    stream holds neither a thread nor a connection. Each event id is the
+    notification id; clients resume with the `Last-Event-ID` header (or
+    `?lastEventId=`) and receive the notifications they missed. Must be
+    served by the ASGI application, as the stream never ends.
+    """
+    # Excluded from the benchmark and query budget route walks
+    streaming = True
+    heartbeat_interval = 15
+    batch_size = 100
+    retry_ms = 3000
+
+    async def get(self, request, id):
+        user = await self.read(self.authenticate, request)
+        if user is None or not user.is_authenticated:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=401
+            )
+        profile = await self.read(Profile.objects.filter(id=id).first)
+        if profile is None:
+            return JsonResponse(
+                {'detail': 'Profile does not exist'}, status=404
+            )
+        if profile.owner_id != user.id:
+            return JsonResponse(
+                {'detail': 'You can only stream your own notifications.'},
+                status=403
+            )
+
+        last_event_id = request.headers.get(
+            'Last-Event-ID', request.GET.get('lastEventId')
+        )
+        try:
+            last_id = int(last_event_id)
+        except (TypeError, ValueError):
+            last_id = None
+
+        response = StreamingHttpResponse(
+            self.events(profile.id, last_id),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop proxies such as nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def read(self, function, *args):
+        """
+        Run a database read on a pooled thread and close the connection it
+        used.
+        """
+        def run():
+            try:
+                return function(*args)
+            finally:
+                connection.close()
+
+        return await sync_to_async(run, thread_sensitive=False)()
+
+    def authenticate(self, request):
+        """
+        Return the user authenticated by the API's authentication classes,
+        or None when the credentials are invalid.
+        """
+        drf_request = Request(request, authenticators=[
+            authentication()
+            for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ])
+        try:
+            return drf_request.user
+        except AuthenticationFailed:
+            return None
+
+    async def events(self, profile_id, last_id):
+        # Subscribe before reading the starting point so nothing committed
+        # in between is missed
+        subscription = broadcaster.subscribe(profile_id)
+        queue = subscription[1]
+        try:
+            if last_id is None:
+                last_id = (await self.read(
+                    Notification.objects.filter(
+                        recipient_id=profile_id
+                    ).aggregate, Max('id')
+                ))['id__max'] or 0
+            yield f'retry: {self.retry_ms}\n\n'
+            while True:
+                notifications = await self.read(
+                    self.notifications_after, profile_id, last_id
+                )
+                for notification in notifications:
+                    last_id = notification['id']
+                    data = json.dumps(notification, cls=JSONEncoder)
+                    yield (
+                        f'id: {last_id}\nevent: notification\n'
+                        f'data: {data}\n\n'
+                    )
+                if len(notifications) == self.batch_size:
+                    continue
+                while True:
+                    try:
+                        await asyncio.wait_for(
+                            queue.get(), self.heartbeat_interval
+                        )
+                        break
+                    except asyncio.TimeoutError:
+                        yield ': heartbeat\n\n'
+                # One read covers every notification published meanwhile
+                while not queue.empty():
+                    queue.get_nowait()
+        finally:
+            broadcaster.unsubscribe(profile_id, subscription)
+
+    def notifications_after(self, profile_id, last_id):
+        """
+        Return up to `batch_size` serialized notifications for the profile
+        newer than `last_id`, oldest first.
+        """
+        notifications = Notification.objects.filter(
+            recipient_id=profile_id, id__gt=last_id,
+            actor__deleted_at__isnull=True, piece__deleted_at__isnull=True
+        ).select_related(
+            'piece__profile__owner', 'actor__owner', 'recipient__owner'
+        ).order_by('id')[:self.batch_size]
+        return NotificationSerializer(notifications, many=True).data
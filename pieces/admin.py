@@ -1,16 +1,25 @@
 from django.contrib import admin
 from pieces.models import Piece, Comment, Rating
+from profiles.admin import DeletedListFilter, SoftDeleteAdminMixin
+from stitch_space_api.pagination import EstimatedCountPaginator
 
 
-class PieceAdmin(admin.ModelAdmin):
+class PieceAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     """
     Custom admin class for the Piece model.
     """
     list_display = ('id', 'title', 'profile', 'art_type', 'featured',
-                    'created_at', 'updated_at')
-    list_filter = ('art_type', 'created_at')
-    search_fields = ('title', 'profile__profilename', 'art_type')
+                    'created_at', 'updated_at', 'deleted_at')
+    list_filter = ('art_type', 'created_at', DeletedListFilter)
+    # Hiding and purging also update the art type rollup, so pieces are
+    # only deleted through the API and the purge_deleted command
+    readonly_fields = ('deleted_at',)
+    list_select_related = ('profile__owner',)
+    autocomplete_fields = ('profile',)
+    search_fields = ('^title', '^profile__owner__username')
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def save_model(self, request, obj, form, change):
         """
@@ -26,8 +35,12 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('id', 'piece_title', 'profile', 'created_at',
                     'content_short')
     list_filter = ('created_at',)
-    search_fields = ('content', 'piece__title', 'profile__profilename')
+    list_select_related = ('piece', 'profile__owner')
+    autocomplete_fields = ('piece', 'profile')
+    search_fields = ('^piece__title', '^profile__owner__username')
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def content_short(self, obj):
         """
@@ -54,8 +67,12 @@ class RatingAdmin(admin.ModelAdmin):
                     'updated_at')
     fields = ('piece', 'profile', 'score')
     list_filter = ('score', 'created_at')
-    search_fields = ('piece__title', 'profile__profilename', 'score')
+    list_select_related = ('piece', 'profile__owner')
+    autocomplete_fields = ('piece', 'profile')
+    search_fields = ('^piece__title', '^profile__owner__username')
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def piece_title(self, obj):
         """
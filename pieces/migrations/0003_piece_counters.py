@@ -0,0 +1,52 @@
+# Generated by Django 5.1.1 on 2026-10-19 11:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Piece = apps.get_model('pieces', 'Piece')
+    Comment = apps.get_model('pieces', 'Comment')
+    Rating = apps.get_model('pieces', 'Rating')
+
+    def per_piece(model, aggregate):
+        return Coalesce(Subquery(
+            model.objects.filter(piece=OuterRef('pk'))
+            .order_by()
+            .values('piece')
+            .annotate(value=aggregate)
+            .values('value')
+        ), 0)
+
+    Piece.objects.update(
+        comment_count=per_piece(Comment, Count('id')),
+        rating_count=per_piece(Rating, Count('id')),
+        rating_total=per_piece(Rating, Sum('score')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pieces', '0002_piece_featured_alter_piece_image_alter_piece_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='piece',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='piece',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='piece',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
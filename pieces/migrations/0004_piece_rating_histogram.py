@@ -0,0 +1,64 @@
+# Generated by Django 5.1.1 on 2026-10-19 11:39
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_histogram(apps, schema_editor):
+    Piece = apps.get_model('pieces', 'Piece')
+    Rating = apps.get_model('pieces', 'Rating')
+
+    def score_count(score):
+        return Coalesce(Subquery(
+            Rating.objects.filter(piece=OuterRef('pk'), score=score)
+            .order_by()
+            .values('piece')
+            .annotate(value=Count('id'))
+            .values('value')
+        ), 0)
+
+    Piece.objects.update(**{
+        f'score_{score}_count': score_count(score) for score in range(6)
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pieces', '0003_piece_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='piece',
+            name='score_0_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='piece',
+            name='score_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='piece',
+            name='score_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='piece',
+            name='score_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='piece',
+            name='score_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='piece',
+            name='score_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_histogram, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pieces', '0004_piece_rating_histogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='piece',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
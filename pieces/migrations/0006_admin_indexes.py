@@ -0,0 +1,47 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:06
+
+from django.db import migrations, models
+
+
+# The admin's `^title` searches compile to UPPER("title"::text) LIKE
+# UPPER('term%') on PostgreSQL, which only an index on that expression
+# with text_pattern_ops can serve
+def create_title_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS pieces_piece_title_upper_like '
+        'ON pieces_piece ((UPPER("title"::text)) text_pattern_ops)'
+    )
+
+
+def drop_title_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS pieces_piece_title_upper_like')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pieces', '0005_piece_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='piece',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='rating',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.RunPython(create_title_index, drop_title_index),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:14
+
+import django.db.models.deletion
+from collections import Counter, defaultdict
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_art_type_stats(apps, schema_editor):
+    Piece = apps.get_model('pieces', 'Piece')
+    ArtTypeStats = apps.get_model('pieces', 'ArtTypeStats')
+    ArtTypeCreator = apps.get_model('pieces', 'ArtTypeCreator')
+    visible = Piece.objects.filter(deleted_at__isnull=True).order_by()
+
+    ArtTypeCreator.objects.bulk_create(
+        (
+            ArtTypeCreator(**row) for row in visible.values(
+                'art_type', 'profile_id'
+            ).annotate(piece_count=Count('id')).iterator()
+        ),
+        batch_size=1000,
+    )
+    creator_counts = dict(
+        ArtTypeCreator.objects.order_by().values('art_type').annotate(
+            count=Count('id')
+        ).values_list('art_type', 'count')
+    )
+    totals = defaultdict(Counter)
+    for row in visible.values('art_type', 'featured').annotate(
+        pieces=Count('id'),
+        ratings=Sum('rating_count'),
+        total=Sum('rating_total'),
+    ):
+        stats = totals[row['art_type']]
+        for prefix in ('', 'featured_') if row['featured'] else ('',):
+            stats[f'{prefix}piece_count'] += row['pieces']
+            stats[f'{prefix}rating_count'] += row['ratings']
+            stats[f'{prefix}rating_total'] += row['total']
+    ArtTypeStats.objects.bulk_create(
+        ArtTypeStats(
+            art_type=art_type,
+            creator_count=creator_counts.get(art_type, 0),
+            **totals[art_type]
+        )
+        for art_type, _ in Piece._meta.get_field('art_type').choices
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pieces', '0006_admin_indexes'),
+        ('profiles', '0006_owner_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArtTypeStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('art_type', models.CharField(choices=[('knitting', 'Knitting'), ('crochet', 'Crochet'), ('embroidery', 'Embroidery'), ('weaving', 'Weaving'), ('dyeing', 'Dyeing'), ('other', 'Other')], max_length=20, unique=True)),
+                ('piece_count', models.IntegerField(default=0)),
+                ('creator_count', models.IntegerField(default=0)),
+                ('rating_count', models.BigIntegerField(default=0)),
+                ('rating_total', models.BigIntegerField(default=0)),
+                ('featured_piece_count', models.IntegerField(default=0)),
+                ('featured_rating_count', models.BigIntegerField(default=0)),
+                ('featured_rating_total', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'art type stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArtTypeCreator',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('art_type', models.CharField(choices=[('knitting', 'Knitting'), ('crochet', 'Crochet'), ('embroidery', 'Embroidery'), ('weaving', 'Weaving'), ('dyeing', 'Dyeing'), ('other', 'Other')], max_length=20)),
+                ('piece_count', models.IntegerField(default=0)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='profiles.profile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('art_type', 'profile'), name='unique_art_type_creator')],
+            },
+        ),
+        migrations.RunPython(
+            backfill_art_type_stats, migrations.RunPython.noop
+        ),
+    ]
@@ -1,9 +1,103 @@
-from django.db import models
-from profiles.models import Profile
+from collections import Counter, defaultdict, namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from changelog.models import record_changes
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import (
+    Case, Count, Exists, F, FloatField, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.utils import timezone
+from profiles.models import Profile, VisibleManager
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 
 
+# Columns of a rating annotated by `PieceQuerySet.with_user_rating`
+USER_RATING_FIELDS = ('id', 'profile_id', 'score', 'created_at', 'updated_at')
+
+
+class PieceQuerySet(models.QuerySet):
+    """
+    QuerySet for pieces with helpers built on the denormalized counters.
+    """
+
+    def with_avg_rating(self):
+        """
+        Annotate `avg_rating` from the maintained rating counters so no join
+        against the ratings table is needed. Unrated pieces average 0.
+        """
+        return self.annotate(
+            avg_rating=Case(
+                When(rating_count=0, then=Value(0.0)),
+                default=(
+                    Cast(F('rating_total'), FloatField()) / F('rating_count')
+                ),
+                output_field=FloatField(),
+            )
+        )
+
+    def with_user_rating(self, user):
+        """
+        Annotate the columns of the user's rating of each piece as
+        `user_rating_<column>`, None where the user hasn't rated it. Each is
+        a correlated subquery served by the unique (profile, piece) index,
+        so the rating is read along with the piece.
+        """
+        ratings = Rating.objects.filter(
+            piece=OuterRef('pk'), profile__owner=user
+        )
+        return self.annotate(**{
+            f'user_rating_{name}': Subquery(ratings.values(name)[:1])
+            for name in USER_RATING_FIELDS
+        })
+
+    def recount(self):
+        """
+        Recompute the comment and rating counters of the selected pieces
+        from the comments and ratings tables. Used after writes that skip
+        the signal handlers, such as bulk inserts.
+        """
+        def per_piece(model, aggregate, **filters):
+            return Coalesce(Subquery(
+                model.objects.filter(piece=OuterRef('pk'), **filters)
+                .order_by()
+                .values('piece')
+                .annotate(value=aggregate)
+                .values('value')
+            ), 0)
+
+        return self.update(
+            comment_count=per_piece(Comment, Count('id')),
+            rating_count=per_piece(Rating, Count('id')),
+            rating_total=per_piece(Rating, Sum('score')),
+            **{
+                f'score_{score}_count': per_piece(
+                    Rating, Count('id'), score=score
+                )
+                for score in range(Rating.MIN_SCORE, Rating.MAX_SCORE + 1)
+            }
+        )
+
+    def hide(self, deleted_at):
+        """
+        Soft-delete the visible pieces of the queryset and take them out of
+        the art type rollup. Returns the pieces that were hidden.
+        """
+        pieces = list(
+            self.filter(deleted_at__isnull=True).only('id', *STATS_FIELDS)
+        )
+        if pieces:
+            Piece.all_objects.filter(
+                id__in=[piece.id for piece in pieces]
+            ).update(deleted_at=deleted_at)
+            update_art_type_stats(
+                removed=[stats_row(piece) for piece in pieces]
+            )
+        return pieces
+
+
 class Piece(models.Model):
     """
     This model represents a Piece with various attributes, which
@@ -25,9 +119,68 @@ class Piece(models.Model):
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE,
                                 related_name='creator')
     art_type = models.CharField(max_length=20, choices=ART_TYPES)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     featured = models.BooleanField(default=False)
+    # Denormalized counters, kept up to date by the signal handlers below
+    comment_count = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    # Rating histogram, one counter per possible score
+    score_0_count = models.PositiveIntegerField(default=0)
+    score_1_count = models.PositiveIntegerField(default=0)
+    score_2_count = models.PositiveIntegerField(default=0)
+    score_3_count = models.PositiveIntegerField(default=0)
+    score_4_count = models.PositiveIntegerField(default=0)
+    score_5_count = models.PositiveIntegerField(default=0)
+
+    # Set when the piece is deleted; the purge_deleted command removes it
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = VisibleManager.from_queryset(PieceQuerySet)()
+    all_objects = PieceQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember what the art type rollup counts the piece under as loaded,
+        so saves that change it can move the piece between rollup rows.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_stats_key = stats_key(instance.__dict__)
+        return instance
+
+    @property
+    def rating_distribution(self):
+        """
+        Return the rating histogram as a mapping of score to count.
+        """
+        return {
+            score: getattr(self, f'score_{score}_count')
+            for score in range(Rating.MIN_SCORE, Rating.MAX_SCORE + 1)
+        }
+
+    def annotated_user_rating(self):
+        """
+        Return the rating annotated by `PieceQuerySet.with_user_rating`, or
+        None when the user hasn't rated the piece.
+        """
+        if getattr(self, 'user_rating_id', None) is None:
+            return None
+        return Rating(piece_id=self.id, **{
+            name: getattr(self, f'user_rating_{name}')
+            for name in USER_RATING_FIELDS
+        })
+
+    def soft_delete(self):
+        """
+        Hide the piece straight away, leaving the removal of its comments,
+        ratings and notifications to the purge_deleted command.
+        """
+        self.deleted_at = timezone.now()
+        with transaction.atomic():
+            if Piece.all_objects.filter(pk=self.pk).hide(self.deleted_at):
+                record_changes('piece', [self], 'deleted')
 
 
 class Comment(models.Model):
@@ -38,7 +191,7 @@ class Comment(models.Model):
     content = models.TextField()
     piece = models.ForeignKey(Piece, on_delete=models.CASCADE)
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
 
 class Rating(models.Model):
@@ -46,13 +199,16 @@ class Rating(models.Model):
     This model represents a Rating given to a Piece by a User Profile.
     """
 
+    MIN_SCORE = 0
+    MAX_SCORE = 5
+
     profile = models.ForeignKey(Profile, on_delete=models.CASCADE)
     piece = models.ForeignKey(Piece, on_delete=models.CASCADE)
     score = models.IntegerField(validators=[
-        MinValueValidator(0),
-        MaxValueValidator(5)
+        MinValueValidator(MIN_SCORE),
+        MaxValueValidator(MAX_SCORE)
     ])
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -64,14 +220,495 @@ class Rating(models.Model):
             )
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the score as loaded so updates can adjust the piece's
+        rating total by the difference.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
     def clean(self):
         """
         Custom validation to prevent a user from rating their own piece.
         """
-        if self.piece.profile == self.profile:
+        if self.piece.profile_id == self.profile_id:
             raise ValidationError("You cannot rate your own piece.")
 
     def save(self, *args, **kwargs):
         # Calls the clean method to ensure validation
         self.clean()
         super().save(*args, **kwargs)
+
+
+class ArtTypeStats(models.Model):
+    """
+    Rollup of the visible pieces of one art type: how many there are, how
+    many profiles created them, and their rating count and total, overall
+    and for featured pieces alone. Kept in step with piece and rating
+    writes by the signal handlers below, so category pages read one row
+    per art type instead of counting pieces.
+    """
+    art_type = models.CharField(
+        max_length=20, choices=Piece.ART_TYPES, unique=True
+    )
+    # Plain integers, so a rollup that has drifted never blocks a write;
+    # rebuild_art_type_stats puts it right
+    piece_count = models.IntegerField(default=0)
+    creator_count = models.IntegerField(default=0)
+    rating_count = models.BigIntegerField(default=0)
+    rating_total = models.BigIntegerField(default=0)
+    featured_piece_count = models.IntegerField(default=0)
+    featured_rating_count = models.BigIntegerField(default=0)
+    featured_rating_total = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'art type stats'
+
+    def __str__(self):
+        return self.art_type
+
+
+class ArtTypeCreator(models.Model):
+    """
+    Number of visible pieces of an art type a profile has, so the creator
+    count of the art type only changes when a profile's first piece of
+    that type appears or its last one goes.
+    """
+    art_type = models.CharField(max_length=20, choices=Piece.ART_TYPES)
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE)
+    piece_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['art_type', 'profile'],
+                name='unique_art_type_creator'
+            )
+        ]
+
+
+# Fields of a piece that decide its art type rollup row and contribution
+STATS_KEY_FIELDS = ('art_type', 'featured', 'profile_id')
+STATS_FIELDS = STATS_KEY_FIELDS + ('rating_count', 'rating_total')
+
+
+def stats_key(values):
+    """
+    Return the art type, featured flag and profile of a piece from a
+    mapping of its field values, or None when any of them is missing.
+    """
+    key = tuple(values.get(field) for field in STATS_KEY_FIELDS)
+    return None if None in key else key
+
+
+def stats_row(piece):
+    return {field: getattr(piece, field) for field in STATS_FIELDS}
+
+
+def change_creator_pieces(art_type, profile_id, delta):
+    """
+    Change the number of pieces of an art type a profile has and return
+    the resulting change in the art type's creator count.
+    """
+    creator = ArtTypeCreator.objects.filter(
+        art_type=art_type, profile_id=profile_id
+    )
+    if delta > 0:
+        if creator.update(piece_count=F('piece_count') + delta):
+            return 0
+        try:
+            with transaction.atomic():
+                ArtTypeCreator.objects.create(
+                    art_type=art_type, profile_id=profile_id,
+                    piece_count=delta
+                )
+            return 1
+        except IntegrityError:
+            # The profile's first piece of the type was added concurrently
+            creator.update(piece_count=F('piece_count') + delta)
+            return 0
+    creator.update(piece_count=F('piece_count') + delta)
+    deleted, _ = creator.filter(piece_count__lte=0).delete()
+    return -deleted
+
+
+def update_art_type_stats(removed=(), added=()):
+    """
+    Take pieces out of the art type rollup and put pieces into it, each
+    given as a mapping of its `STATS_FIELDS`. A piece in both lists moves
+    between rows or has its ratings recounted. Costs one update per art
+    type changed, plus the creator updates of profiles gaining or losing
+    pieces.
+    """
+    totals = defaultdict(Counter)
+    creators = Counter()
+    for sign, pieces in ((-1, removed), (1, added)):
+        for piece in pieces:
+            row = totals[piece['art_type']]
+            for prefix in ('', 'featured_') if piece['featured'] else ('',):
+                row[f'{prefix}piece_count'] += sign
+                row[f'{prefix}rating_count'] += sign * piece['rating_count']
+                row[f'{prefix}rating_total'] += sign * piece['rating_total']
+            creators[piece['art_type'], piece['profile_id']] += sign
+    for (art_type, profile_id), delta in creators.items():
+        if delta:
+            totals[art_type]['creator_count'] += change_creator_pieces(
+                art_type, profile_id, delta
+            )
+    for art_type, deltas in totals.items():
+        updates = {
+            field: F(field) + delta
+            for field, delta in deltas.items() if delta
+        }
+        if updates:
+            ArtTypeStats.objects.filter(art_type=art_type).update(**updates)
+
+
+def update_art_type_ratings(piece_id, deltas):
+    """
+    Apply a change to a piece's rating count and total, given as returned
+    by `rating_counter_deltas`, to the rollup row of its art type in a
+    single update. Ratings of hidden pieces are left out.
+    """
+    count = deltas.get('rating_count', 0)
+    total = deltas.get('rating_total', 0)
+    if not count and not total:
+        return
+    piece = Piece.objects.filter(id=piece_id)
+    featured = Case(
+        When(Exists(piece.filter(featured=True)), then=Value(1)),
+        default=Value(0),
+    )
+    ArtTypeStats.objects.filter(
+        art_type=Subquery(piece.values('art_type'))
+    ).update(
+        rating_count=F('rating_count') + count,
+        rating_total=F('rating_total') + total,
+        featured_rating_count=F('featured_rating_count') + featured * count,
+        featured_rating_total=F('featured_rating_total') + featured * total,
+    )
+
+
+def recount_pieces(piece_ids):
+    """
+    Recount the counters of pieces and apply the resulting changes in
+    their rating counts and totals to the art type rollup.
+    """
+    visible = Piece.objects.filter(id__in=piece_ids)
+    before = list(visible.values(*STATS_FIELDS))
+    Piece.all_objects.filter(id__in=piece_ids).recount()
+    if before:
+        update_art_type_stats(
+            removed=before, added=list(visible.values(*STATS_FIELDS))
+        )
+
+
+def rebuild_art_type_stats():
+    """
+    Recompute the art type rollup from the pieces table. Used after writes
+    that skip the signal handlers, such as bulk inserts.
+    """
+    visible = Piece.objects.order_by()
+    with transaction.atomic():
+        ArtTypeCreator.objects.all().delete()
+        ArtTypeCreator.objects.bulk_create(
+            (
+                ArtTypeCreator(**row) for row in visible.values(
+                    'art_type', 'profile_id'
+                ).annotate(piece_count=Count('id')).iterator()
+            ),
+            batch_size=1000,
+        )
+        creator_counts = dict(
+            ArtTypeCreator.objects.order_by().values('art_type').annotate(
+                count=Count('id')
+            ).values_list('art_type', 'count')
+        )
+        totals = defaultdict(Counter)
+        for row in visible.values('art_type', 'featured').annotate(
+            pieces=Count('id'),
+            ratings=Sum('rating_count'),
+            total=Sum('rating_total'),
+        ):
+            stats = totals[row['art_type']]
+            for prefix in ('', 'featured_') if row['featured'] else ('',):
+                stats[f'{prefix}piece_count'] += row['pieces']
+                stats[f'{prefix}rating_count'] += row['ratings']
+                stats[f'{prefix}rating_total'] += row['total']
+        ArtTypeStats.objects.all().delete()
+        ArtTypeStats.objects.bulk_create(
+            ArtTypeStats(
+                art_type=art_type,
+                creator_count=creator_counts.get(art_type, 0),
+                **totals[art_type]
+            )
+            for art_type, _ in Piece.ART_TYPES
+        )
+
+
+def track_piece_stats(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Keep the art type rollup in step with piece creation and with changes
+    to a piece's art type, featured flag or profile. Hiding pieces is
+    handled by `PieceQuerySet.hide`.
+    """
+    if raw or instance.deleted_at is not None:
+        return
+    loaded_key = getattr(instance, '_loaded_stats_key', None)
+    key = stats_key(instance.__dict__)
+    instance._loaded_stats_key = key
+    if created:
+        update_art_type_stats(added=[stats_row(instance)])
+    elif loaded_key is not None and key is not None and loaded_key != key:
+        # The counters on the instance may be stale
+        counts = Piece.all_objects.filter(id=instance.id).values(
+            'rating_count', 'rating_total'
+        ).get()
+        update_art_type_stats(
+            removed=[{**dict(zip(STATS_KEY_FIELDS, loaded_key)), **counts}],
+            added=[{**dict(zip(STATS_KEY_FIELDS, key)), **counts}],
+        )
+
+
+def untrack_deleted_piece(sender, instance, **kwargs):
+    """
+    Take a visible piece that is deleted outright, rather than soft-deleted
+    first, out of the art type rollup. Hiding it before the deletion of its
+    ratings keeps those from being taken out a second time.
+    """
+    if instance.deleted_at is None:
+        Piece.all_objects.filter(pk=instance.pk).hide(timezone.now())
+
+
+# Pieces whose counters need a recount, while counter updates are deferred
+_deferred_piece_ids = ContextVar('deferred_piece_ids', default=None)
+
+
+@contextmanager
+def deferred_counter_updates():
+    """
+    Within the block, comment and rating writes only record the pieces they
+    affect; those pieces are recounted once on leaving the block. Used for
+    bulk deletions, where updating the counters row by row would cost one
+    query per deleted row.
+    """
+    piece_ids = set()
+    token = _deferred_piece_ids.set(piece_ids)
+    try:
+        yield piece_ids
+    finally:
+        _deferred_piece_ids.reset(token)
+    if piece_ids:
+        recount_pieces(piece_ids)
+
+
+def update_comment_count(sender, instance, created=True, **kwargs):
+    """
+    Keep `Piece.comment_count` in step with comment creation and deletion,
+    including deletions cascaded from a piece or profile.
+    """
+    deferred = _deferred_piece_ids.get()
+    if deferred is not None:
+        deferred.add(instance.piece_id)
+        return
+    if kwargs.get('signal') is post_delete:
+        delta = -1
+    elif created:
+        delta = 1
+    else:
+        return
+    Piece.all_objects.filter(id=instance.piece_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def rating_counter_deltas(old_score=None, new_score=None):
+    """
+    Return the changes to the `Piece` rating counters for a rating moving
+    from `old_score` to `new_score`, where None means no rating. Covers the
+    rating count, the rating total and the per-score histogram.
+    """
+    deltas = {}
+    count_delta = (new_score is not None) - (old_score is not None)
+    total_delta = (new_score or 0) - (old_score or 0)
+    if count_delta:
+        deltas['rating_count'] = count_delta
+    if total_delta:
+        deltas['rating_total'] = total_delta
+    if old_score != new_score:
+        if old_score is not None:
+            deltas[f'score_{old_score}_count'] = -1
+        if new_score is not None:
+            deltas[f'score_{new_score}_count'] = 1
+    return deltas
+
+
+def rating_counter_updates(old_score=None, new_score=None):
+    """
+    Build the `Piece` update expressions for a rating moving from
+    `old_score` to `new_score`.
+    """
+    return {
+        field: F(field) + delta
+        for field, delta in rating_counter_deltas(old_score, new_score).items()
+    }
+
+
+def update_rating_counters(sender, instance, created=True, **kwargs):
+    """
+    Keep the piece's rating count, total and histogram in step with rating
+    creation, score changes and deletion.
+    """
+    deferred = _deferred_piece_ids.get()
+    if deferred is not None:
+        deferred.add(instance.piece_id)
+        instance._loaded_score = instance.score
+        return
+    loaded_score = getattr(instance, '_loaded_score', instance.score)
+    if kwargs.get('signal') is post_delete:
+        old_score, new_score = loaded_score, None
+    elif created:
+        old_score, new_score = None, instance.score
+    else:
+        old_score, new_score = loaded_score, instance.score
+    instance._loaded_score = instance.score
+    updates = rating_counter_updates(old_score, new_score)
+    if updates:
+        Piece.all_objects.filter(id=instance.piece_id).update(**updates)
+        update_art_type_ratings(
+            instance.piece_id, rating_counter_deltas(old_score, new_score)
+        )
+
+
+RatingUpsert = namedtuple('RatingUpsert', [
+    'rating', 'created', 'piece_owner_id', 'rating_count', 'rating_total'
+])
+
+
+def upsert_rating(profile_id, piece_id, score):
+    """
+    Create or update a profile's rating of a piece and apply the change to
+    the piece's rating counters, in one transaction. On PostgreSQL the
+    own-piece check and the insert-or-update are a single statement.
+
+    Returns a `RatingUpsert`, or None when the piece does not exist or
+    belongs to the profile.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            result = _upsert_rating_statement(profile_id, piece_id, score)
+            if result is None:
+                return None
+            rating, created, piece_owner_id, previous_score = result
+            if created:
+                deltas = rating_counter_deltas(new_score=score)
+            elif previous_score is None:
+                # A concurrent request inserted the rating between our read
+                # of the previous score and the upsert; recount instead
+                recount_pieces([piece_id])
+                deltas = {}
+            else:
+                deltas = rating_counter_deltas(previous_score, score)
+            rating_count, rating_total = _apply_rating_deltas(
+                piece_id, deltas
+            )
+            update_art_type_ratings(piece_id, deltas)
+            # The statement bypasses the model signals
+            record_changes(
+                'rating', [rating], 'created' if created else 'updated'
+            )
+        else:
+            piece = Piece.objects.filter(id=piece_id).exclude(
+                profile_id=profile_id
+            ).only('id', 'profile_id').first()
+            if piece is None:
+                return None
+            piece_owner_id = piece.profile_id
+            rating = Rating.objects.select_for_update().filter(
+                profile_id=profile_id, piece_id=piece_id
+            ).first()
+            created = rating is None
+            if created:
+                rating = Rating(profile_id=profile_id, piece=piece)
+            rating.score = score
+            # The signal handlers update the piece's counters
+            rating.save()
+            rating_count, rating_total = Piece.all_objects.filter(
+                id=piece_id
+            ).values_list('rating_count', 'rating_total').get()
+    return RatingUpsert(
+        rating, created, piece_owner_id, rating_count, rating_total
+    )
+
+
+def _upsert_rating_statement(profile_id, piece_id, score):
+    """
+    Insert or update the rating with a single INSERT ... ON CONFLICT that
+    only selects the piece when it exists and belongs to someone else.
+    Returns the rating, whether it was inserted, the piece's owner and the
+    previous score.
+    """
+    now = timezone.now()
+    sql = f"""
+        WITH target AS (
+            SELECT id, profile_id FROM {Piece._meta.db_table}
+            WHERE id = %(piece)s
+                AND profile_id <> %(profile)s
+                AND deleted_at IS NULL
+        ), previous AS (
+            SELECT score FROM {Rating._meta.db_table}
+            WHERE piece_id = %(piece)s AND profile_id = %(profile)s
+            FOR UPDATE
+        )
+        INSERT INTO {Rating._meta.db_table}
+            (profile_id, piece_id, score, created_at, updated_at)
+        SELECT %(profile)s, id, %(score)s, %(now)s, %(now)s FROM target
+        ON CONFLICT (profile_id, piece_id) DO UPDATE
+            SET score = EXCLUDED.score, updated_at = EXCLUDED.updated_at
+        RETURNING id, created_at, updated_at, (xmax = 0),
+            (SELECT profile_id FROM target), (SELECT score FROM previous)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'profile': profile_id, 'piece': piece_id, 'score': score,
+            'now': now,
+        })
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    (rating_id, created_at, updated_at, created, piece_owner_id,
+     previous_score) = row
+    rating = Rating(
+        id=rating_id, profile_id=profile_id, piece_id=piece_id, score=score,
+        created_at=created_at, updated_at=updated_at,
+    )
+    return rating, created, piece_owner_id, previous_score
+
+
+def _apply_rating_deltas(piece_id, deltas):
+    """
+    Apply rating counter changes to a piece and return its new rating
+    count and total.
+    """
+    table = Piece._meta.db_table
+    assignments = ', '.join(
+        f'{field} = {field} + %s' for field in deltas
+    ) or 'rating_count = rating_count'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET {assignments} WHERE id = %s '
+            'RETURNING rating_count, rating_total',
+            [*deltas.values(), piece_id],
+        )
+        return cursor.fetchone()
+
+
+post_save.connect(update_comment_count, sender=Comment)
+post_delete.connect(update_comment_count, sender=Comment)
+post_save.connect(update_rating_counters, sender=Rating)
+post_delete.connect(update_rating_counters, sender=Rating)
+post_save.connect(track_piece_stats, sender=Piece)
+pre_delete.connect(untrack_deleted_piece, sender=Piece)
@@ -1,10 +1,11 @@
-from pieces.models import Piece, Comment, Rating
+from pieces.models import ArtTypeStats, Piece, Comment, Rating
 from profiles.models import Profile
-from profiles.serializers import ProfileSerializer
+from profiles.serializers import ProfileCardListSerializer, ProfileSerializer
 from rest_framework import serializers
+from stitch_space_api.fieldsets import SparseFieldsetMixin
 
 
-class PieceSerializer(serializers.ModelSerializer):
+class PieceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Converts Piece objects into a format suitable for API responses.
     It provides additional related data for the associated 'profile'
@@ -16,32 +17,41 @@ class PieceSerializer(serializers.ModelSerializer):
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
     updatedAt = serializers.DateTimeField(source='updated_at', read_only=True)
     rating = serializers.FloatField(source='avg_rating', read_only=True)
+    commentCount = serializers.IntegerField(source='comment_count',
+                                            read_only=True)
     userRating = serializers.SerializerMethodField()
     userName = serializers.ReadOnlyField(source='owner.username')
     featured = serializers.BooleanField(read_only=True)
+    # `user_rating` is set on the piece by the view, not read from a column
+    method_field_sources = {'userRating': []}
 
     class Meta:
         model = Piece
         fields = [
             'id', 'title', 'image', 'profile', 'artType',
-            'createdAt', 'updatedAt', 'rating', 'userRating',
-            'userName', 'featured'
+            'createdAt', 'updatedAt', 'rating', 'commentCount',
+            'userRating', 'userName', 'featured'
         ]
+        list_serializer_class = ProfileCardListSerializer
 
     def get_userRating(self, obj):
         if hasattr(obj, 'user_rating') and obj.user_rating:
             return RatingSerializer(obj.user_rating).data
         return None
 
+    def get_included_queryset(self):
+        # Pieces side-loaded by the compact format keep their average rating
+        return Piece.all_objects.with_avg_rating()
 
-class CommentSerializer(serializers.ModelSerializer):
+
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Converts Comment objects into a format suitable for API responses.
     It provides additional related data for the associated 'profile'
     field using a custom method to include nested data from the `Profile` model
     """
     piece = serializers.PrimaryKeyRelatedField(read_only=True)
-    profile = serializers.SerializerMethodField()
+    profile = ProfileSerializer(read_only=True)
     createdAt = serializers.DateTimeField(source='created_at', read_only=True)
 
     class Meta:
@@ -49,14 +59,10 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'content', 'piece', 'profile', 'createdAt'
         ]
-
-    def get_profile(self, obj):
-        if hasattr(obj, 'profile') and obj.profile:
-            return ProfileSerializer(obj.profile).data
-        return None
+        list_serializer_class = ProfileCardListSerializer
 
 
-class RatingSerializer(serializers.ModelSerializer):
+class RatingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Converts Rating objects into a format suitable for API responses.
     Includes related 'profile' and 'piece' fields as primary keys and
@@ -72,3 +78,77 @@ class RatingSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'profile', 'piece', 'score', 'createdAt', 'updatedAt'
         ]
+
+
+class RatingSummarySerializer(SparseFieldsetMixin,
+                              serializers.ModelSerializer):
+    """
+    Converts the rating counters stored on a Piece into a summary of its
+    ratings: the number of ratings, the average score and the number of
+    ratings given for each score.
+    """
+    piece = serializers.IntegerField(source='id', read_only=True)
+    count = serializers.IntegerField(source='rating_count', read_only=True)
+    average = serializers.SerializerMethodField()
+    distribution = serializers.SerializerMethodField()
+    method_field_sources = {
+        'average': ['rating_count', 'rating_total'],
+        'distribution': [
+            f'score_{score}_count'
+            for score in range(Rating.MIN_SCORE, Rating.MAX_SCORE + 1)
+        ],
+    }
+
+    class Meta:
+        model = Piece
+        fields = ['piece', 'count', 'average', 'distribution']
+
+    def get_average(self, obj):
+        if obj.rating_count:
+            return obj.rating_total / obj.rating_count
+        return 0
+
+    def get_distribution(self, obj):
+        return {
+            str(score): count
+            for score, count in obj.rating_distribution.items()
+        }
+
+
+class ArtTypeStatsSerializer(SparseFieldsetMixin,
+                             serializers.ModelSerializer):
+    """
+    Converts the rollup row of an art type into its number of pieces and
+    creators and the number and average of their ratings, with the same
+    figures for its featured pieces alone.
+    """
+    artType = serializers.CharField(source='art_type', read_only=True)
+    pieces = serializers.IntegerField(source='piece_count', read_only=True)
+    creators = serializers.IntegerField(source='creator_count',
+                                        read_only=True)
+    ratingCount = serializers.IntegerField(source='rating_count',
+                                           read_only=True)
+    averageRating = serializers.SerializerMethodField()
+    featured = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArtTypeStats
+        fields = [
+            'artType', 'pieces', 'creators', 'ratingCount', 'averageRating',
+            'featured'
+        ]
+
+    def get_averageRating(self, obj):
+        if obj.rating_count:
+            return obj.rating_total / obj.rating_count
+        return 0
+
+    def get_featured(self, obj):
+        return {
+            'pieces': obj.featured_piece_count,
+            'ratingCount': obj.featured_rating_count,
+            'averageRating': (
+                obj.featured_rating_total / obj.featured_rating_count
+                if obj.featured_rating_count else 0
+            ),
+        }
@@ -0,0 +1,284 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from notifications.models import Notification
+from pieces.models import (
+    Comment, Piece, Rating, deferred_counter_updates, upsert_rating
+)
+from rest_framework.test import APIClient
+
+
+class PieceCounterTests(TestCase):
+    """
+    Tests for the comment and rating counters maintained on each piece.
+    """
+
+    def setUp(self):
+        self.owner, self.rater, self.other = [
+            User.objects.create_user(
+                username=name, email=f'{name}@example.com', password='pw'
+            ).profile
+            for name in ('owner', 'rater', 'other')
+        ]
+        self.piece = Piece.objects.create(
+            profile=self.owner, title='Scarf', art_type='knitting'
+        )
+
+    def assertCounters(self, comments, scores):
+        """
+        Check the piece's counters against the expected comment count and
+        rating scores, and against a recount from the tables.
+        """
+        self.piece.refresh_from_db()
+        expected = {
+            'comment_count': comments,
+            'rating_count': len(scores),
+            'rating_total': sum(scores),
+            'rating_distribution': {
+                score: scores.count(score)
+                for score in range(Rating.MIN_SCORE, Rating.MAX_SCORE + 1)
+            },
+        }
+        actual = {
+            name: getattr(self.piece, name) for name in expected
+        }
+        self.assertEqual(actual, expected)
+        Piece.all_objects.filter(pk=self.piece.pk).recount()
+        self.piece.refresh_from_db()
+        self.assertEqual(
+            {name: getattr(self.piece, name) for name in expected}, expected
+        )
+
+    def test_comment_count(self):
+        first = Comment.objects.create(
+            piece=self.piece, profile=self.rater, content='Lovely'
+        )
+        Comment.objects.create(
+            piece=self.piece, profile=self.other, content='Nice'
+        )
+        self.assertCounters(2, [])
+        first.content = 'Edited'
+        first.save()
+        self.assertCounters(2, [])
+        first.delete()
+        self.assertCounters(1, [])
+
+    def test_rating_counters(self):
+        rating = Rating.objects.create(
+            piece=self.piece, profile=self.rater, score=4
+        )
+        Rating.objects.create(piece=self.piece, profile=self.other, score=2)
+        self.assertCounters(0, [4, 2])
+        rating.score = 5
+        rating.save()
+        self.assertCounters(0, [5, 2])
+        rating.delete()
+        self.assertCounters(0, [2])
+
+    def test_upsert_rating(self):
+        result = upsert_rating(self.rater.id, self.piece.id, 3)
+        self.assertTrue(result.created)
+        self.assertCounters(0, [3])
+        result = upsert_rating(self.rater.id, self.piece.id, 1)
+        self.assertFalse(result.created)
+        self.assertEqual((result.rating_count, result.rating_total), (1, 1))
+        self.assertCounters(0, [1])
+        self.assertIsNone(upsert_rating(self.owner.id, self.piece.id, 5))
+        self.assertCounters(0, [1])
+
+    def test_queryset_delete(self):
+        for profile, score in ((self.rater, 1), (self.other, 5)):
+            Comment.objects.create(
+                piece=self.piece, profile=profile, content='Hi'
+            )
+            Rating.objects.create(
+                piece=self.piece, profile=profile, score=score
+            )
+        Comment.objects.filter(profile=self.rater).delete()
+        Rating.objects.filter(profile=self.rater).delete()
+        self.assertCounters(1, [5])
+
+    def test_cascaded_delete(self):
+        Comment.objects.create(
+            piece=self.piece, profile=self.rater, content='Hi'
+        )
+        Rating.objects.create(piece=self.piece, profile=self.rater, score=3)
+        Rating.objects.create(piece=self.piece, profile=self.other, score=4)
+        self.rater.owner.delete()
+        self.assertCounters(0, [4])
+
+    def seed(self, count):
+        """
+        Give the piece a comment and a rating from each of `count` new
+        profiles, and return the profiles with their scores.
+        """
+        profiles = [
+            User.objects.create_user(
+                username=f'fan{number}', email=f'fan{number}@example.com'
+            ).profile
+            for number in range(count)
+        ]
+        scores = [number % (Rating.MAX_SCORE + 1) for number in range(count)]
+        for profile, score in zip(profiles, scores):
+            Comment.objects.create(
+                piece=self.piece, profile=profile, content='Lovely'
+            )
+            Rating.objects.create(
+                piece=self.piece, profile=profile, score=score
+            )
+        return profiles, scores
+
+    def test_many_ratings_and_comments(self):
+        profiles, scores = self.seed(48)
+        self.assertCounters(48, scores)
+        for profile in profiles[:12]:
+            upsert_rating(profile.id, self.piece.id, Rating.MAX_SCORE)
+        scores[:12] = [Rating.MAX_SCORE] * 12
+        self.assertCounters(48, scores)
+
+    def test_bulk_deletions(self):
+        profiles, scores = self.seed(48)
+        removed = [profile.id for profile in profiles[::3]]
+        Comment.objects.filter(profile_id__in=removed).delete()
+        Rating.objects.filter(profile_id__in=removed).delete()
+        kept = [
+            score for profile, score in zip(profiles, scores)
+            if profile.id not in removed
+        ]
+        self.assertCounters(32, kept)
+        with deferred_counter_updates():
+            removed = [profile.id for profile in profiles[1::3]]
+            Comment.objects.filter(profile_id__in=removed).delete()
+            Rating.objects.filter(profile_id__in=removed).delete()
+        self.assertCounters(16, scores[2::3])
+
+    def test_purge_deleted_piece_with_many_rows(self):
+        profiles, _ = self.seed(36)
+        other_piece = Piece.objects.create(
+            profile=self.owner, title='Hat', art_type='knitting'
+        )
+        Comment.objects.create(
+            piece=other_piece, profile=profiles[0], content='Hi'
+        )
+        self.piece.soft_delete()
+        call_command('purge_deleted', batch_size=10, stdout=StringIO())
+        self.assertFalse(Piece.all_objects.filter(pk=self.piece.pk).exists())
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Rating.objects.count(), 0)
+        self.piece = other_piece
+        self.assertCounters(1, [])
+
+    def test_ordering_by_comments(self):
+        quiet = Piece.objects.create(
+            profile=self.owner, title='Hat', art_type='knitting'
+        )
+        self.seed(3)
+        client = APIClient()
+        for ordering, ids in (
+            ('comments', [quiet.id, self.piece.id]),
+            ('-comments', [self.piece.id, quiet.id]),
+        ):
+            response = client.get(
+                reverse('piece-list'), {'ordering': ordering}
+            )
+            self.assertEqual(
+                [piece['id'] for piece in response.data['results']], ids
+            )
+
+    def test_purge_deleted_profile(self):
+        Comment.objects.create(
+            piece=self.piece, profile=self.rater, content='Hi'
+        )
+        Comment.objects.create(
+            piece=self.piece, profile=self.other, content='Hey'
+        )
+        Rating.objects.create(piece=self.piece, profile=self.rater, score=2)
+        self.rater.soft_delete()
+        call_command('purge_deleted', batch_size=1, stdout=StringIO())
+        self.assertCounters(1, [])
+
+
+class SoftDeleteTests(TestCase):
+    """
+    Tests for how hidden pieces and profiles are treated by the API and
+    the admin.
+    """
+
+    def setUp(self):
+        self.owner, self.visitor = [
+            User.objects.create_user(
+                username=name, email=f'{name}@example.com', password='pw'
+            )
+            for name in ('owner', 'visitor')
+        ]
+        self.piece = Piece.objects.create(
+            profile=self.owner.profile, title='Scarf', art_type='knitting'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.visitor)
+
+    def test_hidden_piece_dependents(self):
+        comments = reverse('comment-list', args=[self.piece.id])
+        ratings = reverse('piece-ratings', args=[self.piece.id])
+        self.client.post(comments, {'content': 'Lovely'}, format='json')
+        self.client.post(ratings, {'score': 4}, format='json')
+        self.piece.soft_delete()
+
+        response = self.client.post(
+            comments, {'content': 'Again'}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(self.client.get(comments).data['results'], [])
+        self.assertEqual(self.client.get(ratings).data['results'], [])
+        self.assertEqual(
+            self.client.get(reverse('rating-list')).data['results'], []
+        )
+        owner = APIClient()
+        owner.force_authenticate(self.owner)
+        notifications = owner.get(reverse(
+            'profile-notifications-list', args=[self.owner.profile.id]
+        ))
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(notifications.data['results'], [])
+
+    def test_deleted_profile_cannot_write(self):
+        self.visitor.profile.soft_delete()
+        responses = [
+            self.client.post(reverse('piece-create'), {
+                'title': 'Hat', 'artType': 'knitting',
+                'image': 'https://example.com/hat.png',
+            }, format='json'),
+            self.client.post(
+                reverse('comment-list', args=[self.piece.id]),
+                {'content': 'Hi'}, format='json'
+            ),
+            self.client.put(
+                reverse('piece-rating-upsert', args=[self.piece.id]),
+                {'score': 3}, format='json'
+            ),
+            self.client.post(
+                reverse('profile-follow-add', args=[self.owner.profile.id])
+            ),
+        ]
+        self.assertEqual(
+            [response.status_code for response in responses], [403] * 4
+        )
+        self.assertEqual(Piece.all_objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertEqual(Rating.objects.count(), 0)
+
+    def test_admin_lists_hidden_pieces(self):
+        self.owner.is_staff = self.owner.is_superuser = True
+        self.owner.save()
+        self.piece.soft_delete()
+        self.client.force_login(self.owner)
+        url = reverse('admin:pieces_piece_changelist')
+        for query, count in (('', 1), ('?deleted=yes', 1), ('?deleted=no', 0)):
+            response = self.client.get(url + query)
+            self.assertEqual(
+                response.context['cl'].result_count, count, query
+            )
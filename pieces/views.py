@@ -1,65 +1,121 @@
 from django.shortcuts import render
-from pieces.models import Piece, Comment, Rating
+from pieces.models import ArtTypeStats, Piece, Comment, Rating, upsert_rating
 from profiles.models import Profile, Follower
 from notifications.models import Notification
-from rest_framework import generics, filters
+from rest_framework import generics, filters, status
 from pieces.serializers import (
     PieceSerializer,
     CommentSerializer,
-    RatingSerializer
+    RatingSerializer,
+    RatingSummarySerializer,
+    ArtTypeStatsSerializer
 )
 from rest_framework.permissions import (
     IsAuthenticated,
     IsAuthenticatedOrReadOnly
 )
 from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from django_filters.rest_framework import DjangoFilterBackend
+from idempotency.views import IdempotentCreateMixin
+from stitch_space_api.compact import CompactListMixin
+from stitch_space_api.fieldsets import SparseFieldsetViewMixin
+from stitch_space_api.filters import IdListFilter
+from stitch_space_api.permissions import HasVisibleProfile
+from stitch_space_api.throttling import TokenBucketThrottle
 from django.shortcuts import get_object_or_404
-from django.db import IntegrityError
-from django.db.models import Avg, Q, Count, Subquery, OuterRef, FloatField
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Avg, Q, Count, F, Subquery, OuterRef, FloatField
+)
+
+
+def attach_user_ratings(pieces, user):
+    """
+    Set `user_rating` on each piece to the user's rating of it, or None,
+    reading the ratings of all the pieces in one query.
+    """
+    ratings = {
+        rating.piece_id: rating for rating in Rating.objects.filter(
+            profile__owner=user, piece__in=[piece.id for piece in pieces]
+        )
+    }
+    for piece in pieces:
+        piece.user_rating = ratings.get(piece.id)
+
+
+class UserRatingListMixin:
+    """
+    List view mixin setting the caller's rating on the pieces of each page,
+    read in one query, so lists fill in `userRating`. Skipped for anonymous
+    requests and when `userRating` isn't requested.
+    """
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if (
+            page
+            and self.request.user.is_authenticated
+            and "userRating" in self.get_serializer().fields
+        ):
+            attach_user_ratings(page, self.request.user)
+        return page
 
 
-class PieceFeedListView(generics.ListAPIView):
+class PieceFeedListView(UserRatingListMixin, CompactListMixin,
+                        SparseFieldsetViewMixin, generics.ListAPIView):
     """
     API view to list pieces created by profiles followed by the currently
     authenticated user. Retrieves the user's profile, identifies followed
     profiles, and filters the `Piece` queryset to include only pieces from
-    those profiles. Also annotates each piece with the average rating.
+    those profiles. Also annotates each piece with the average rating and
+    sets the user's own rating of it.
     """
     queryset = Piece.objects.all()
     serializer_class = PieceSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "feed"
 
     def get_queryset(self):
-        # Get the profile of the currently authenticated user
-        user_profile = Profile.objects.get(owner=self.request.user)
-
-        # Get the profiles that the current user is following
+        # Get the profiles that the current user is following, joined
+        # through their profile rather than looking it up first
         followed_profiles = Follower.objects.filter(
-            follower=user_profile
+            follower__owner=self.request.user
         ).values_list(
             "followed_profile",
             flat=True
         )
 
         # Filter Piece queryset to return pieces created by followed profiles
-        return Piece.objects.annotate(
-            avg_rating=Avg("rating__score", default=0),
-        ).filter(profile__in=followed_profiles)
+        queryset = Piece.objects.select_related("profile__owner").filter(
+            profile__in=followed_profiles
+        )
+        if self.reads_source("avg_rating"):
+            queryset = queryset.with_avg_rating()
+        return self.sparse_queryset(queryset)
 
 
-class PieceListView(generics.ListAPIView):
+class PieceListView(UserRatingListMixin, CompactListMixin,
+                    SparseFieldsetViewMixin, generics.ListAPIView):
     """
     API view to list and filter pieces, with support for searching and
-    ordering. Annotates each piece with average rating and comment
-    count. Supports filtering by art type, profile, and featured
-    status, and searching by title and profile owner's name. Allows
-    ordering by any field, with default ordering by creation date.
+    ordering. The average rating and comment count come from the counters
+    maintained on each piece, so no aggregation joins are needed. Supports
+    filtering by art type, profile, and featured status, and searching by
+    title and profile owner's name. Allows ordering by any field, with
+    default ordering by creation date; `comments` is kept as an alias of
+    `comment_count` for clients ordering by it.
+    `?ids=` fetches a batch of pieces by id. Authenticated callers get
+    their own rating of each piece in `userRating`.
     """
-    queryset = Piece.objects.annotate(
-        avg_rating=Avg("rating__score", default=0), comments=Count("comment")
-    )
+    queryset = Piece.objects.select_related("profile__owner")
     serializer_class = PieceSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "piece-list"
     filter_backends = [
+        IdListFilter,
         DjangoFilterBackend,
         filters.SearchFilter,
         filters.OrderingFilter,
@@ -73,129 +129,205 @@ class PieceListView(generics.ListAPIView):
     ordering_fields = "__all__"
     ordering = ["-created_at"]
 
+    def get_queryset(self):
+        # The average rating is only computed when returned or sorted on
+        queryset = super().get_queryset()
+        if self.reads_source("avg_rating"):
+            queryset = queryset.with_avg_rating()
+        if self.reads_source("comments"):
+            queryset = queryset.alias(comments=F("comment_count"))
+        return self.sparse_queryset(queryset)
 
-class PieceCreateView(generics.CreateAPIView):
+
+class PieceCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     """
     API view to create a new piece using `PieceSerializer`. 
     Automatically associates the new piece with the profile of the currently
-    authenticated user. Requires authentication to create a piece.
+    authenticated user. Requires authentication to create a piece. Retries
+    sent with the same `Idempotency-Key` get the first response back.
     """
     serializer_class = PieceSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasVisibleProfile]
 
     def perform_create(self, serializer):
-        # Automatically set the profile to the currently authenticated user
-        serializer.save(profile=self.request.user.profile)
+        # Automatically set the profile to the currently authenticated user,
+        # saving the piece and its change log entry together
+        with transaction.atomic():
+            serializer.save(profile=self.request.user.profile)
 
 
 class PieceRUDView(generics.RetrieveUpdateDestroyAPIView):
     """
-    API view to retrieve, update, or delete a piece. Annotates the piece with
-    the average rating and retrieves the current user's rating if it exists.
-    Ensures that only the owner of the piece can modify or delete it. Also
-    filters pieces based on profiles followed by the current user. Permissions:
-    authenticated users can modify their own pieces, others can only view.
+    API view to retrieve, update, or delete a piece. The piece is read in a
+    single query together with its author, its average rating from the
+    maintained counters and the current user's rating of it. Add
+    `?include=comments` to embed the first page of its comments with their
+    authors, read with one more query. Anonymous requests skip the rating
+    lookup and their responses may be cached for `anonymous_max_age`
+    seconds. Ensures that only the owner of the piece can modify or delete
+    it. Permissions: authenticated users can modify their own pieces,
+    others can only view. Deleting hides the piece immediately; the
+    purge_deleted command removes it and its comments, ratings and
+    notifications later.
     """
     serializer_class = PieceSerializer
-    permission_classes = [IsAuthenticatedOrReadOnly]
-
-    def get_object(self):
-
-        user_profile = Profile.objects.get(owner=self.request.user)
+    permission_classes = [IsAuthenticatedOrReadOnly, HasVisibleProfile]
+    anonymous_max_age = 60
 
-        # Get the profiles that the current user is following
-        followed_profiles = Follower.objects.filter(
-            follower=user_profile
-        ).values_list(
-            "followed_profile",
-            flat=True
-        )
-
-        # Filter Piece queryset to return pieces created by followed profiles
-        piece = Piece.objects.annotate(
-            avg_rating=Avg("rating__score", default=0),
-        ).get(id=self.kwargs["id"])
+    def get_queryset(self):
+        queryset = Piece.objects.select_related(
+            "profile__owner"
+        ).with_avg_rating()
+        if self.request.user.is_authenticated:
+            queryset = queryset.with_user_rating(self.request.user)
+        return queryset
 
-        # Retrieve the user's rating for this piece (if it exists)
-        try:
-            user_rating = Rating.objects.get(profile=user_profile, piece=piece)
-        except Rating.DoesNotExist:
-            user_rating = None  # If the user hasn't rated the piece yet
+    def get_object(self):
+        piece = get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
 
         # For PUT, PATCH, DELETE: ensure only the owner can modify or delete
         if (
             self.request.method in ["PUT", "PATCH", "DELETE"]
-            and piece.profile != self.request.user.profile
+            and piece.profile.owner_id != self.request.user.id
         ):
             raise PermissionDenied(
                 "You do not have permission to edit or delete this piece."
             )
-        piece.user_rating = user_rating
+        piece.user_rating = piece.annotated_user_rating()
         return piece
 
-
-class CommentListCreateView(generics.ListCreateAPIView):
+    def retrieve(self, request, *args, **kwargs):
+        piece = self.get_object()
+        data = self.get_serializer(piece).data
+
+        # Optionally embed the rating summary, read from the same piece row,
+        # and the first page of comments
+        include = request.query_params.get("include", "").split(",")
+        if "ratingSummary" in include:
+            data["ratingSummary"] = RatingSummarySerializer(piece).data
+        if "comments" in include:
+            data["comments"] = self.comment_preview(piece)
+
+        response = Response(data)
+        if not request.user.is_authenticated:
+            patch_cache_control(
+                response, public=True, max_age=self.anonymous_max_age
+            )
+            patch_vary_headers(response, ["Cookie", "Authorization"])
+        return response
+
+    def comment_preview(self, piece):
+        """
+        Return the first page of the piece's comments, newest first, as the
+        comment list endpoint would: `nextPage` is "2" when there are more.
+        """
+        page_size = api_settings.PAGE_SIZE
+        comments = list(Comment.objects.filter(
+            piece=piece, profile__deleted_at__isnull=True
+        ).select_related("profile__owner").order_by(
+            "-created_at"
+        )[:page_size + 1])
+        return {
+            "nextPage": "2" if len(comments) > page_size else None,
+            "previousPage": None,
+            "results": CommentSerializer(
+                comments[:page_size], many=True
+            ).data,
+        }
+
+    def perform_update(self, serializer):
+        # Save the piece and its change log entry together
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        instance.soft_delete()
+
+
+class CommentListCreateView(IdempotentCreateMixin, CompactListMixin,
+                            SparseFieldsetViewMixin,
+                            generics.ListCreateAPIView):
     """
     API view to list and create comments for a specific piece.
     Filters comments by the piece ID and orders them by creation date.
     On creation, associates the comment with the piece and the user's profile. 
     If the comment is on another user's piece, a notification is triggered.
+    Creation honours `Idempotency-Key`, so retries don't duplicate comments.
     Permissions: authenticated users can create comments, others can only view.
     """
     serializer_class = CommentSerializer
-    permission_classes = [IsAuthenticatedOrReadOnly]
+    permission_classes = [IsAuthenticatedOrReadOnly, HasVisibleProfile]
     filter_backends = [filters.OrderingFilter]
     ordering_fields = "__all__"
     ordering = ["-created_at"]
 
     def get_queryset(self):
         piece_id = self.kwargs["id"]
-        return Comment.objects.filter(piece__id=piece_id)
+        return self.sparse_queryset(Comment.objects.filter(
+            piece__id=piece_id, piece__deleted_at__isnull=True,
+            profile__deleted_at__isnull=True
+        ).select_related("profile__owner"))
 
     def perform_create(self, serializer):
         piece_id = self.kwargs["id"]
-        piece = Piece.objects.get(id=piece_id)
-        serializer.save(piece=piece, profile=self.request.user.profile)
-
-        # Create notification if the piece belongs to someone else
-        if piece.profile != self.request.user.profile:
-            Notification.objects.create(
-                piece=piece,
-                actor=self.request.user.profile,
-                recipient=piece.profile,
-                interaction_type="comment",
-            )
+        piece = get_object_or_404(Piece, id=piece_id)
+
+        # The comment, the piece's comment count and the notification are
+        # written together
+        with transaction.atomic():
+            serializer.save(piece=piece, profile=self.request.user.profile)
+
+            # Create notification if the piece belongs to someone else
+            if piece.profile != self.request.user.profile:
+                Notification.objects.create(
+                    piece=piece,
+                    actor=self.request.user.profile,
+                    recipient=piece.profile,
+                    interaction_type="comment",
+                )
 
 
-class RatingListView(generics.ListAPIView):
+class RatingListView(SparseFieldsetViewMixin, generics.ListAPIView):
     """
     API view to list ratings. Supports filtering by piece and profile
     using DjangoFilterBackend. Uses `RatingSerializer` to serialize the
     data for API responses.
     """
-    queryset = Rating.objects.all()
+    queryset = Rating.objects.filter(
+        piece__deleted_at__isnull=True, profile__deleted_at__isnull=True
+    )
     serializer_class = RatingSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["piece", "profile"]
 
+    def get_queryset(self):
+        return self.sparse_queryset(super().get_queryset())
+
 
-class PieceRatingListCreateView(generics.ListCreateAPIView):
+class PieceRatingListCreateView(IdempotentCreateMixin,
+                                SparseFieldsetViewMixin,
+                                generics.ListCreateAPIView):
     """
     API view to list and create ratings for a specific piece.
     Filters ratings by the profile ID and ensures users can only rate each
     piece once. On creating a rating, if the piece belongs to another user,
     a notification is triggered. Raises a validation error if the user has
-    already rated the piece. Permissions: authenticated users can create
-    ratings, others can only view.
+    already rated the piece, unless the request is a retry carrying the
+    same `Idempotency-Key`, which gets the first response back.
+    Permissions: authenticated users can create ratings, others can only
+    view.
     """
     serializer_class = RatingSerializer
-    permission_classes = [IsAuthenticatedOrReadOnly]
+    permission_classes = [IsAuthenticatedOrReadOnly, HasVisibleProfile]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["profile__owner__id"]
 
     def get_queryset(self):
         piece_id = self.kwargs["id"]
-        return Rating.objects.filter(piece__id=piece_id)
+        return self.sparse_queryset(Rating.objects.filter(
+            piece__id=piece_id, piece__deleted_at__isnull=True,
+            profile__deleted_at__isnull=True
+        ))
 
     def perform_create(self, serializer):
         piece_id = self.kwargs["id"]
@@ -203,16 +335,17 @@ class PieceRatingListCreateView(generics.ListCreateAPIView):
         profile = self.request.user.profile
 
         try:
-            rating = serializer.save(piece=piece, profile=profile)
-
-            # Create notification if the piece belongs to someone else
-            if piece.profile != self.request.user.profile:
-                Notification.objects.create(
-                    piece=piece,
-                    actor=self.request.user.profile,
-                    recipient=piece.profile,
-                    interaction_type="rating",
-                )
+            with transaction.atomic():
+                rating = serializer.save(piece=piece, profile=profile)
+
+                # Create notification if the piece belongs to someone else
+                if piece.profile != self.request.user.profile:
+                    Notification.objects.create(
+                        piece=piece,
+                        actor=self.request.user.profile,
+                        recipient=piece.profile,
+                        interaction_type="rating",
+                    )
 
         except IntegrityError:
             raise ValidationError("You have already rated this piece.")
@@ -220,6 +353,88 @@ class PieceRatingListCreateView(generics.ListCreateAPIView):
             raise ValidationError(e.detail)
 
 
+class PieceRatingUpsertView(generics.GenericAPIView):
+    """
+    API view to set the current user's rating of a piece in one request,
+    creating the rating or updating the existing one. The own-piece check
+    and the insert-or-update happen in a single statement, and the piece's
+    rating counters are updated in the same transaction. Responds with the
+    rating and the piece's new average. A notification is triggered the
+    first time a piece is rated. Requires authentication.
+    """
+    serializer_class = RatingSerializer
+    permission_classes = [IsAuthenticated, HasVisibleProfile]
+
+    def put(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        piece_id = self.kwargs["id"]
+        profile = request.user.profile
+
+        with transaction.atomic():
+            result = upsert_rating(
+                profile.id, piece_id, serializer.validated_data["score"]
+            )
+            if result is None:
+                # Only look up why the upsert did nothing when it failed
+                get_object_or_404(Piece, id=piece_id)
+                raise ValidationError("You cannot rate your own piece.")
+
+            if result.created:
+                Notification.objects.create(
+                    piece_id=piece_id,
+                    actor=profile,
+                    recipient_id=result.piece_owner_id,
+                    interaction_type="rating",
+                )
+
+        return Response(
+            {
+                "rating": RatingSerializer(result.rating).data,
+                "pieceRating": (
+                    result.rating_total / result.rating_count
+                    if result.rating_count else 0
+                ),
+                "ratingCount": result.rating_count,
+            },
+            status=(
+                status.HTTP_201_CREATED if result.created
+                else status.HTTP_200_OK
+            ),
+        )
+
+
+class PieceRatingSummaryView(generics.RetrieveAPIView):
+    """
+    API view to retrieve the rating summary of a specific piece: the number
+    of ratings, the average score and the 0-5 score distribution. Reads the
+    counters stored on the piece, so it is a single-row lookup however many
+    ratings the piece has.
+    """
+    queryset = Piece.objects.only(
+        "id", "rating_count", "rating_total", *(
+            f"score_{score}_count"
+            for score in range(Rating.MIN_SCORE, Rating.MAX_SCORE + 1)
+        )
+    )
+    serializer_class = RatingSummarySerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    lookup_field = "id"
+
+
+class PieceStatsView(generics.ListAPIView):
+    """
+    API view listing, for each art type, the number of visible pieces and
+    of the profiles who created them, and the count and average of their
+    ratings, overall and for featured pieces. Reads the rollup maintained
+    on piece and rating writes: one query for six rows, however many
+    pieces there are.
+    """
+    queryset = ArtTypeStats.objects.order_by("art_type")
+    serializer_class = ArtTypeStatsSerializer
+    pagination_class = None
+
+
 class RatingRUDView(generics.RetrieveUpdateDestroyAPIView):
     """
     API view to retrieve, update, or delete a specific rating.
@@ -228,15 +443,23 @@ class RatingRUDView(generics.RetrieveUpdateDestroyAPIView):
     for update and delete actions. Raises a permission error if the user
     attempts to modify a rating they do not own.
     """
-    queryset = Rating.objects.all()
+    queryset = Rating.objects.filter(
+        piece__deleted_at__isnull=True, profile__deleted_at__isnull=True
+    )
     serializer_class = RatingSerializer
-    permission_classes = [IsAuthenticatedOrReadOnly]
+    permission_classes = [IsAuthenticatedOrReadOnly, HasVisibleProfile]
 
     def get_object(self):
-        rating = get_object_or_404(Rating, id=self.kwargs["id"])
+        rating = get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
         if self.request.method in ["PUT", "PATCH", "DELETE"]:
             if rating.profile != self.request.user.profile:
                 raise PermissionDenied(
                     "You do not have permission to modify this rating."
                 )
         return rating
+
+    def perform_update(self, serializer):
+        # Save the rating, the piece counters and the change log entry
+        # together
+        with transaction.atomic():
+            serializer.save()
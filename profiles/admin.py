@@ -1,8 +1,40 @@
 from django.contrib import admin
 from profiles.models import Profile, Follower
+from stitch_space_api.pagination import EstimatedCountPaginator
 
 
-class ProfileAdmin(admin.ModelAdmin):
+class DeletedListFilter(admin.SimpleListFilter):
+    """
+    Filter soft-deleted rows in or out of an admin changelist.
+    """
+    title = 'deleted'
+    parameter_name = 'deleted'
+
+    def lookups(self, request, model_admin):
+        return (('yes', 'Yes'), ('no', 'No'))
+
+    def queryset(self, request, queryset):
+        if self.value() in ('yes', 'no'):
+            return queryset.filter(deleted_at__isnull=self.value() == 'no')
+        return queryset
+
+
+class SoftDeleteAdminMixin:
+    """
+    Admin mixin listing soft-deleted rows too, which the default manager
+    of the model hides, so they can still be inspected before the
+    purge_deleted command removes them.
+    """
+
+    def get_queryset(self, request):
+        queryset = self.model.all_objects.get_queryset()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+
+class ProfileAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     """
     Custom admin class for the Profile model to manage profiles in the admin
     interface.
@@ -15,16 +47,25 @@ class ProfileAdmin(admin.ModelAdmin):
         'image',
         'created_at',
         'updated_at',
+        'deleted_at',
     )
     fields = (
         'id',
         'owner',
         'image',
         'biography',
+        'deleted_at',
+    )
+    list_filter = (DeletedListFilter,)
+    readonly_fields = ('id', 'last_visited_notifications', 'deleted_at')
+    list_select_related = ('owner',)
+    autocomplete_fields = ('owner',)
+    search_fields = (
+        '^owner__username', '^owner__first_name', '^owner__last_name'
     )
-    readonly_fields = ('id', 'last_visited_notifications')
-    search_fields = ('first_name', 'last_name')
     ordering = ('id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
@@ -35,8 +76,14 @@ class FollowerAdmin(admin.ModelAdmin):
     Admin class for the Follower model to manage follower relationships.
     """
     list_display = ('follower', 'followed_profile', 'created_at')
-    search_fields = ('follower__profilename', 'followed_profile__profilename')
+    search_fields = (
+        '^follower__owner__username', '^followed_profile__owner__username'
+    )
     list_filter = ('created_at',)
+    list_select_related = ('follower__owner', 'followed_profile__owner')
+    autocomplete_fields = ('follower', 'followed_profile')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProfileConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profiles'
+
+    def ready(self):
+        # Connects the signal handlers invalidating cached profile cards
+        from profiles import cards  # noqa: F401
@@ -0,0 +1,68 @@
+"""
+Bulk registration of users. Users, their profiles and their email
+addresses are inserted in chunks with `bulk_create`, bypassing the
+per-user signals, while keeping the username set to the email address.
+"""
+from itertools import islice
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.functions import Upper
+from profiles.models import Profile
+
+
+def bulk_import_users(rows, chunk_size=1000):
+    """
+    Create users from an iterable of dicts with `email`, `first_name` and
+    `last_name`, plus either a plain `password`, an already hashed
+    `password_hash` or neither (the user then gets an unusable password
+    and must reset it). Emails that are already registered, or repeated
+    in the input, are skipped. Each chunk is written in one transaction.
+    Returns the number of users created and skipped.
+    """
+    created = skipped = 0
+    seen = set()
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, chunk_size)):
+        emails = [row['email'].strip().lower() for row in chunk]
+        # Usernames registered through signup keep the case they were
+        # typed in. UPPER() matches the owner search index on PostgreSQL.
+        existing = {
+            username.lower() for username in User.objects.annotate(
+                upper_username=Upper('username')
+            ).filter(
+                upper_username__in=[email.upper() for email in emails]
+            ).values_list('upper_username', flat=True)
+        }
+
+        users = []
+        for email, row in zip(emails, chunk):
+            if email in existing or email in seen:
+                skipped += 1
+                continue
+            seen.add(email)
+            if row.get('password_hash'):
+                password = row['password_hash']
+            else:
+                password = make_password(row.get('password') or None)
+            users.append(User(
+                username=email,
+                email=email,
+                first_name=row.get('first_name', ''),
+                last_name=row.get('last_name', ''),
+                password=password,
+            ))
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(users)
+            Profile.objects.bulk_create(
+                Profile(owner_id=user.id) for user in users
+            )
+            EmailAddress.objects.bulk_create(
+                EmailAddress(user_id=user.id, email=user.email, primary=True)
+                for user in users
+            )
+        created += len(users)
+    return {'created': created, 'skipped': skipped}
@@ -0,0 +1,127 @@
+"""
+Profile card fragment cache. The nested profile that pieces, comments,
+notifications, follows and leaderboard entries carry is cached as a
+serialized dict per profile, and list serializers fetch the cards of a
+whole page with one multi-get instead of serializing each profile again.
+
+Cards are keyed by a version per profile, replaced when the profile or its
+user is saved, so a changed profile is never read from an older card. The
+follower, following and piece counts change far more often than the rest
+of the card; they are left out of it and still read from the annotations
+of each request.
+
+Cards are only used with a cache shared by every worker. A process-local
+cache would never see the version bumps made by other workers, which
+would keep serving cards of profiles changed since.
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from profiles.models import Profile
+
+# Seconds a card is kept, which also bounds how stale a card written by a
+# request racing a profile update can be
+CARD_TIMEOUT = 300
+# Sources of the ProfileSerializer fields left out of cards
+COUNT_SOURCES = ('followed_count', 'follower_count', 'pieces_count')
+
+
+def cards_enabled():
+    """
+    Return whether the default cache is shared between processes, which
+    cards need for their invalidation to reach every worker.
+    """
+    return not isinstance(caches['default'], (
+        DummyCache, LocMemCache
+    ))
+
+
+def version_key(profile_id):
+    return f'profile_card_version_{profile_id}'
+
+
+def card_key(profile_id, version):
+    return f'profile_card_{profile_id}_{version}'
+
+
+def new_version():
+    return time.time_ns()
+
+
+def get_cards(profile_ids, build_cards):
+    """
+    Return a dict of profile id to card for the profile ids, reading them
+    from the cache with one multi-get for their versions and one for the
+    cards. Missing cards are made with one `build_cards(ids)` call, which
+    returns a dict of id to card, and stored.
+    """
+    profile_ids = set(profile_ids)
+    if not profile_ids:
+        return {}
+    versions = cache.get_many([version_key(id) for id in profile_ids])
+    keys = {}
+    for id in profile_ids:
+        version = versions.get(version_key(id))
+        if version is None:
+            # Start profiles the cache has no version for on a new one, so
+            # cards from before the version was evicted are never read.
+            # Only cache the card when no update got there first.
+            version = new_version()
+            if not cache.add(version_key(id), version, timeout=None):
+                continue
+        keys[card_key(id, version)] = id
+    found = cache.get_many(keys)
+    cards = {keys[key]: card for key, card in found.items()}
+    missing = profile_ids - cards.keys()
+    if missing:
+        cards.update(build_cards(missing))
+        cache.set_many({
+            key: cards[id] for key, id in keys.items()
+            if key not in found and id in cards
+        }, timeout=CARD_TIMEOUT)
+    return cards
+
+
+def invalidate_cards(profile_ids):
+    """
+    Move the profiles to new card versions once the current transaction
+    commits, leaving their cached cards to expire unread.
+    """
+    if not profile_ids or not cards_enabled():
+        return
+
+    def bump():
+        version = new_version()
+        cache.set_many(
+            {version_key(id): version for id in profile_ids}, timeout=None
+        )
+
+    transaction.on_commit(bump)
+
+
+def invalidate_profile(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_cards([instance.pk])
+
+
+def invalidate_owner(sender, instance, created, raw=False,
+                     update_fields=None, **kwargs):
+    # Logins only touch last_login, which cards don't show
+    if (
+        raw or created or update_fields == frozenset(['last_login'])
+        or not cards_enabled()
+    ):
+        return
+    invalidate_cards(list(Profile.all_objects.filter(
+        owner=instance
+    ).values_list('id', flat=True)))
+
+
+post_save.connect(invalidate_profile, sender=Profile)
+post_delete.connect(invalidate_profile, sender=Profile)
+post_save.connect(invalidate_owner, sender=User)
@@ -0,0 +1,171 @@
+"""
+Creator leaderboard. Creators are ranked by the Bayesian average of the
+ratings of their visible pieces: their mean score pulled towards the
+site-wide mean of the art type, weighted as `PRIOR_WEIGHT` extra ratings,
+so a couple of top scores don't outrank a long record of good ones.
+
+Rankings are materialized in `CreatorRanking`. Each refresh re-aggregates
+only the creators whose pieces or ratings appear in the change log since
+the previous one, and rescores an art type as a whole only when its mean
+rating has moved.
+"""
+from collections import defaultdict
+from itertools import islice
+
+from changelog.models import ChangeLogEntry, log_position
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Sum
+from django.db.models import Value
+from pieces.models import ArtTypeStats, Piece, Rating
+from profiles.models import CreatorRanking, LeaderboardState, Profile
+
+# Art type of the rankings across all art types
+ALL_TYPES = ''
+# Number of ratings at the mean every creator's average starts from
+PRIOR_WEIGHT = 10
+# An art type is rescored once its mean rating moves by more than this
+PRIOR_TOLERANCE = 0.01
+
+
+def prior_means():
+    """
+    Return the mean rating of visible pieces per art type, and across all
+    of them, from the art type rollup. Without ratings the middle of the
+    scale is used.
+    """
+    counts, totals = defaultdict(int), defaultdict(int)
+    for art_type, count, total in ArtTypeStats.objects.values_list(
+        'art_type', 'rating_count', 'rating_total'
+    ):
+        for key in (art_type, ALL_TYPES):
+            counts[key] += count
+            totals[key] += total
+    neutral = (Rating.MIN_SCORE + Rating.MAX_SCORE) / 2
+    return {
+        key: totals[key] / counts[key] if counts[key] else neutral
+        for key in [ALL_TYPES, *(art_type for art_type, _ in Piece.ART_TYPES)]
+    }
+
+
+def bayesian_score(rating_total, rating_count, mean):
+    return (PRIOR_WEIGHT * mean + rating_total) / (PRIOR_WEIGHT + rating_count)
+
+
+def rank_profiles(profile_ids, means):
+    """
+    Replace the rankings of profiles with ones aggregated from the rating
+    counters of their visible pieces. Hidden profiles and profiles without
+    pieces end up with no rankings.
+    """
+    rankings = {}
+    for row in Piece.objects.filter(
+        profile_id__in=profile_ids, profile__deleted_at__isnull=True
+    ).order_by().values('profile_id', 'art_type').annotate(
+        pieces=Count('id'),
+        ratings=Sum('rating_count'),
+        total=Sum('rating_total'),
+    ):
+        for art_type in (row['art_type'], ALL_TYPES):
+            key = (row['profile_id'], art_type)
+            ranking = rankings.get(key)
+            if ranking is None:
+                ranking = rankings[key] = CreatorRanking(
+                    profile_id=row['profile_id'], art_type=art_type
+                )
+            ranking.piece_count += row['pieces']
+            ranking.rating_count += row['ratings']
+            ranking.rating_total += row['total']
+    for ranking in rankings.values():
+        ranking.score = bayesian_score(
+            ranking.rating_total, ranking.rating_count,
+            means[ranking.art_type]
+        )
+    with transaction.atomic():
+        CreatorRanking.objects.filter(profile_id__in=profile_ids).delete()
+        CreatorRanking.objects.bulk_create(rankings.values())
+
+
+def rescore(art_type, mean):
+    """
+    Recompute the scores of every ranking of an art type for a new mean,
+    from the counts already stored, in a single update.
+    """
+    CreatorRanking.objects.filter(art_type=art_type).update(
+        score=ExpressionWrapper(
+            (Value(PRIOR_WEIGHT * mean) + F('rating_total'))
+            / (Value(PRIOR_WEIGHT) + F('rating_count')),
+            output_field=FloatField(),
+        )
+    )
+
+
+def changed_profiles(field, since, horizon):
+    """
+    Return the ids of the profiles whose rankings may have changed with
+    the change log entries positioned in [since, horizon) by `field`, see
+    `log_position`: authors of changed pieces, owners of rated pieces and
+    deleted profiles.
+    """
+    entries = ChangeLogEntry.objects.filter(
+        **{f'{field}__gte': since, f'{field}__lt': horizon}
+    ).order_by()
+    profile_ids = set(entries.filter(kind='piece').values_list(
+        'profile_id', flat=True
+    ).distinct())
+    profile_ids.update(entries.filter(
+        kind='profile', action='deleted'
+    ).values_list('object_id', flat=True))
+    rated_pieces = entries.filter(kind='rating').values_list(
+        'piece_id', flat=True
+    ).distinct()
+    profile_ids.update(Piece.all_objects.filter(
+        id__in=rated_pieces
+    ).values_list('profile_id', flat=True).distinct())
+    return profile_ids
+
+
+def refresh_leaderboard(full=False, batch_size=1000):
+    """
+    Bring the rankings up to date and return the number of profiles
+    re-ranked. Everything is recomputed when `full` is set, on the first
+    refresh, or when the change log has been trimmed past the last one.
+    """
+    # Entries of transactions still in flight are positioned at or above
+    # the horizon, so the next refresh reads them once they commit
+    field, horizon = log_position()
+    oldest = ChangeLogEntry.objects.order_by(field).values_list(
+        field, flat=True
+    ).first()
+    state = LeaderboardState.objects.first()
+    if state is None:
+        state = LeaderboardState()
+        full = True
+    elif oldest is not None and state.synced_position < oldest:
+        full = True
+    means = prior_means()
+
+    if full:
+        profile_ids = iter(Profile.all_objects.order_by('id').values_list(
+            'id', flat=True
+        ))
+    else:
+        for art_type, mean in means.items():
+            previous = state.prior_means.get(art_type)
+            if previous is None or abs(previous - mean) > PRIOR_TOLERANCE:
+                rescore(art_type, mean)
+            else:
+                # Keep the mean the stored scores were computed with
+                means[art_type] = previous
+        profile_ids = iter(sorted(
+            changed_profiles(field, state.synced_position, horizon)
+        ))
+
+    ranked = 0
+    while batch := list(islice(profile_ids, batch_size)):
+        rank_profiles(batch, means)
+        ranked += len(batch)
+
+    state.synced_position = horizon
+    state.prior_means = means
+    state.save()
+    return ranked
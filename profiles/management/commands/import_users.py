@@ -0,0 +1,40 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from profiles.bulk import bulk_import_users
+
+
+class Command(BaseCommand):
+    """
+    Management command to register users in bulk from a CSV or JSON lines
+    file, creating their profiles in the same chunked inserts.
+    """
+    help = (
+        'Import users from a CSV file (with an email, first_name, last_name '
+        'and optional password or password_hash column) or a JSON lines '
+        'file with the same keys.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, newline='') as source:
+                if path.endswith(('.jsonl', '.ndjson')):
+                    rows = (
+                        json.loads(line) for line in source if line.strip()
+                    )
+                else:
+                    rows = csv.DictReader(source)
+                result = bulk_import_users(rows, options['chunk_size'])
+        except (OSError, KeyError, ValueError) as error:
+            raise CommandError(f'Could not import {path}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} users, "
+            f"skipped {result['skipped']} already registered."
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from profiles.leaderboard import refresh_leaderboard
+
+
+class Command(BaseCommand):
+    """
+    Management command to bring the creator leaderboard up to date. Only
+    the creators with piece or rating changes in the change log since the
+    last run are re-ranked, so it can run every few minutes.
+    """
+    help = (
+        'Re-rank the creators whose pieces or ratings changed since the '
+        'last run, or every creator with --full.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Recompute the rankings of every creator.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        ranked = refresh_leaderboard(
+            full=options['full'], batch_size=options['batch_size']
+        )
+        self.stdout.write(f'Ranked {ranked} creators.')
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_alter_profile_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
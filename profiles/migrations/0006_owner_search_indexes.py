@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+# The admin searches profiles, and the models pointing at them, by owner
+# name prefix. On PostgreSQL `^` searches compile to UPPER("col"::text)
+# LIKE UPPER('term%'), which needs an index on that expression with
+# text_pattern_ops. auth_user belongs to Django, so the indexes are
+# created here rather than declared on a model.
+OWNER_SEARCH_COLUMNS = ('username', 'first_name', 'last_name')
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in OWNER_SEARCH_COLUMNS:
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS auth_user_%s_upper_like '
+            'ON auth_user ((UPPER("%s"::text)) text_pattern_ops)'
+            % (column, column)
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in OWNER_SEARCH_COLUMNS:
+        schema_editor.execute(
+            'DROP INDEX IF EXISTS auth_user_%s_upper_like' % column
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('profiles', '0005_profile_deleted_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
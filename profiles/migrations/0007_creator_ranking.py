@@ -0,0 +1,39 @@
+# Generated by Django 5.1.1 on 2026-10-19 12:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_owner_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('synced_seq', models.BigIntegerField(default=0)),
+                ('prior_means', models.JSONField(default=dict)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CreatorRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('art_type', models.CharField(blank=True, max_length=20)),
+                ('piece_count', models.IntegerField(default=0)),
+                ('rating_count', models.BigIntegerField(default=0)),
+                ('rating_total', models.BigIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='profiles.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['art_type', '-score', '-rating_count', 'id'], name='creator_ranking_order')],
+                'constraints': [models.UniqueConstraint(fields=('art_type', 'profile'), name='unique_creator_ranking')],
+            },
+        ),
+    ]
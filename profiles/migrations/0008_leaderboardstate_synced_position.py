@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('changelog', '0002_entry_txid'),
+        ('profiles', '0007_creator_ranking'),
+    ]
+
+    # Seqs are not positions on PostgreSQL, so the field is replaced rather
+    # than renamed. The next refresh starts from position 0 and, once the
+    # change log holds anything, recomputes everyone.
+    operations = [
+        migrations.RemoveField(
+            model_name='leaderboardstate',
+            name='synced_seq',
+        ),
+        migrations.AddField(
+            model_name='leaderboardstate',
+            name='synced_position',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -1,6 +1,18 @@
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, transaction
+from django.db.models.signals import pre_save, post_save
+from changelog.models import record_changes
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class VisibleManager(models.Manager):
+    """
+    Default manager excluding rows that have been soft-deleted and are
+    waiting to be purged.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class Profile(models.Model):
@@ -17,6 +29,11 @@ class Profile(models.Model):
     last_visited_notifications = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when the profile is deleted; the purge_deleted command removes it
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = VisibleManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         """
@@ -24,16 +41,34 @@ class Profile(models.Model):
         """
         return self.owner.username
 
+    def soft_delete(self):
+        """
+        Hide the profile and its pieces straight away, leaving the removal
+        of their dependent rows to the purge_deleted command.
+        """
+        self.deleted_at = timezone.now()
+        with transaction.atomic():
+            Profile.all_objects.filter(pk=self.pk).update(
+                deleted_at=self.deleted_at
+            )
+            pieces = self.creator.hide(self.deleted_at)
+            record_changes('profile', [self], 'deleted')
+            record_changes('piece', pieces, 'deleted')
+
+
+def set_username_from_email(sender, instance, **kwargs):
+    # Set the username to the email when the User is created, before it is
+    # written, so creating a user takes a single write
+    if instance._state.adding and instance.email:
+        instance.username = instance.email
+
 
 def create_profile(sender, instance, created, **kwargs):
     if created:
-        # Set the username to the email when the User is created
-        instance.username = instance.email
-        # Save the User with the updated username
-        instance.save()
         Profile.objects.create(owner=instance)
 
 
+pre_save.connect(set_username_from_email, sender=User)
 post_save.connect(create_profile, sender=User)
 
 
@@ -62,3 +97,46 @@ class Follower(models.Model):
         Return a string representation of the follow relationship.
         """
         return f'{self.follower} follows {self.followed_profile}'
+
+
+class CreatorRanking(models.Model):
+    """
+    A profile's standing on the creator leaderboard, overall (blank art
+    type) or for one art type: its number of visible pieces, the ratings
+    they received and their Bayesian average, the mean score pulled
+    towards the site-wide mean the fewer ratings there are. Materialized
+    by the refresh_leaderboard command.
+    """
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE,
+                                related_name='rankings')
+    art_type = models.CharField(max_length=20, blank=True)
+    piece_count = models.IntegerField(default=0)
+    rating_count = models.BigIntegerField(default=0)
+    rating_total = models.BigIntegerField(default=0)
+    score = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['art_type', 'profile'],
+                name='unique_creator_ranking'
+            )
+        ]
+        indexes = [
+            # Leaderboard pages are ranges of this index
+            models.Index(
+                fields=['art_type', '-score', '-rating_count', 'id'],
+                name='creator_ranking_order'
+            )
+        ]
+
+
+class LeaderboardState(models.Model):
+    """
+    Progress of the leaderboard refresh, kept in a single row: the change
+    log position up to which entries are applied, see `log_position`, and
+    the mean rating each art type's scores were computed with.
+    """
+    synced_position = models.BigIntegerField(default=0)
+    prior_means = models.JSONField(default=dict)
+    refreshed_at = models.DateTimeField(auto_now=True)
@@ -1,8 +1,75 @@
-from profiles.models import Profile, Follower
+from profiles.cards import COUNT_SOURCES, cards_enabled, get_cards
+from profiles.models import CreatorRanking, Profile, Follower
 from rest_framework import serializers
+from stitch_space_api.fieldsets import SparseFieldsetMixin
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+def build_cards(profile_ids):
+    """
+    Serialize the cached part of profiles, every field but the counts,
+    from one query. The profiles are read again rather than taken from the
+    page, whose querysets may have been trimmed to a few columns.
+    """
+    fields = ProfileSerializer._declared_fields
+    return {
+        profile.pk: {
+            name: value
+            for name, value in ProfileSerializer(profile).data.items()
+            if name not in fields or fields[name].source not in COUNT_SOURCES
+        }
+        for profile in Profile.all_objects.select_related('owner').filter(
+            pk__in=profile_ids
+        )
+    }
+
+
+def nested_profiles(serializer, instances, found):
+    """
+    Collect, for each ProfileSerializer field nested anywhere in a
+    serializer, the profiles it will serialize for `instances`.
+    """
+    for field in serializer.fields.values():
+        if not isinstance(field, serializers.Serializer):
+            continue
+        related = []
+        for instance in instances:
+            try:
+                value = field.get_attribute(instance)
+            except (AttributeError, KeyError):
+                continue
+            if value is not None:
+                related.append(value)
+        if isinstance(field, ProfileSerializer):
+            found.setdefault(field, []).extend(related)
+        else:
+            nested_profiles(field, related, found)
+    return found
+
+
+class ProfileCardListSerializer(serializers.ListSerializer):
+    """
+    List serializer giving the nested profiles of a page their cached
+    cards, fetched for the whole page at once.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        if not cards_enabled():
+            return super().to_representation(items)
+        found = nested_profiles(self.child, items, {})
+        cards = get_cards(
+            {
+                profile.pk
+                for profiles in found.values() for profile in profiles
+            },
+            build_cards
+        )
+        for field in found:
+            field.cards = cards
+        return super().to_representation(items)
+
+
+class ProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Converts Profile objects into a format suitable for API responses.
     Includes owner-related data such as first name, last name, and email,
@@ -31,6 +98,22 @@ class ProfileSerializer(serializers.ModelSerializer):
             'is_following', 'pieces'
         ]
 
+    def to_representation(self, instance):
+        # Use the cached card when the list serializer fetched one, adding
+        # the counts, which cards leave out
+        card = getattr(self, 'cards', {}).get(instance.pk)
+        if card is None:
+            return super().to_representation(instance)
+        data = {}
+        for name, field in self.fields.items():
+            if name in card:
+                data[name] = card[name]
+            elif field.source in COUNT_SOURCES and hasattr(
+                instance, field.source
+            ):
+                data[name] = getattr(instance, field.source)
+        return data
+
     def update(self, instance, validated_data):
         # Pop owner data to update the User model
         owner_data = validated_data.pop('owner', {})
@@ -52,13 +135,13 @@ class ProfileSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class FollowerSerializer(serializers.ModelSerializer):
+class FollowerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Converts Follower objects into a format suitable for API responses.
     Includes related profile data for both 'followedProfile' and
     'followerProfile'. Dynamically controls the output based on the
-    'view_type' context, omitting fields when appropriate (e.g.,
-    'followers_only' or 'following_only').
+    'view_type' context, leaving out the profile the list is about
+    ('followers_only' or 'following_only') before serializing.
     """
     followedProfile = ProfileSerializer(source='followed_profile', read_only=True)
     followerProfile = ProfileSerializer(source='follower',
@@ -68,19 +151,79 @@ class FollowerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Follower
         fields = ['id', 'followedProfile', 'followerProfile', 'createdAt']
+        list_serializer_class = ProfileCardListSerializer
 
-    def to_representation(self, instance):
-        """
-        Override the to_representation method to dynamically control the output
-        """
-        representation = super().to_representation(instance)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
 
         # If context 'view_type' set to 'followers_only' omit 'followedProfile'
-        if self.context.get('view_type') == 'followers_only':
-            representation.pop('followedProfile', None)
+        if self._context.get('view_type') == 'followers_only':
+            self.fields.pop('followedProfile', None)
 
         # If context 'view_type' set to 'following_only' omit 'followerProfile'
-        if self.context.get('view_type') == 'following_only':
-            representation.pop('followerProfile', None)
+        if self._context.get('view_type') == 'following_only':
+            self.fields.pop('followerProfile', None)
+
+
+class FollowListSerializer(FollowerSerializer):
+    """
+    Converts the follows of a follower or following list. Adds whether the
+    current user follows the listed profile and whether it follows them
+    back, set on each follow by the list view.
+    """
+    isFollowedByMe = serializers.BooleanField(source='is_followed_by_me',
+                                              read_only=True)
+    followsMe = serializers.BooleanField(source='follows_me', read_only=True)
+
+    class Meta(FollowerSerializer.Meta):
+        fields = FollowerSerializer.Meta.fields + [
+            'isFollowedByMe', 'followsMe'
+        ]
+
+
+class UserImportSerializer(serializers.Serializer):
+    """
+    Validates one user of a bulk import. The password may be given in plain
+    text, as an existing Django password hash, or left out.
+    """
+    email = serializers.EmailField()
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    password = serializers.CharField(required=False, write_only=True)
+    password_hash = serializers.CharField(required=False, write_only=True)
+
+
+class CreatorRankingSerializer(SparseFieldsetMixin,
+                               serializers.ModelSerializer):
+    """
+    Converts a CreatorRanking into a leaderboard entry: the profile, its
+    score, the plain average and number of the ratings its pieces
+    received, and its number of pieces. `artType` is null on the overall
+    leaderboard.
+    """
+    profile = ProfileSerializer(read_only=True)
+    artType = serializers.SerializerMethodField()
+    averageRating = serializers.SerializerMethodField()
+    ratingCount = serializers.IntegerField(source='rating_count',
+                                           read_only=True)
+    pieces = serializers.IntegerField(source='piece_count', read_only=True)
+    method_field_sources = {
+        'artType': ['art_type'],
+        'averageRating': ['rating_count', 'rating_total'],
+    }
+
+    class Meta:
+        model = CreatorRanking
+        fields = [
+            'profile', 'artType', 'score', 'averageRating', 'ratingCount',
+            'pieces'
+        ]
+        list_serializer_class = ProfileCardListSerializer
+
+    def get_artType(self, obj):
+        return obj.art_type or None
 
-        return representation
+    def get_averageRating(self, obj):
+        if obj.rating_count:
+            return obj.rating_total / obj.rating_count
+        return 0
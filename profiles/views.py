@@ -1,40 +1,123 @@
+import json
+import zlib
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
-from profiles.models import Profile, Follower
+from profiles.models import CreatorRanking, Profile, Follower
 from notifications.models import Notification
+from notifications.serializers import NotificationSerializer
+from pieces.models import Piece, Comment, Rating
+from pieces.serializers import (
+    PieceSerializer,
+    CommentSerializer,
+    RatingSerializer
+)
 from django.contrib.auth.models import User
 from rest_framework import generics, status, filters
-from profiles.serializers import ProfileSerializer, FollowerSerializer
+from profiles.bulk import bulk_import_users
+from profiles.cards import COUNT_SOURCES
+from profiles.serializers import (
+    ProfileSerializer,
+    FollowerSerializer,
+    FollowListSerializer,
+    UserImportSerializer,
+    CreatorRankingSerializer
+)
 from django.contrib.auth import get_user_model
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
-from django.http import Http404
-from django.db.models import Count
+from rest_framework.utils.encoders import JSONEncoder
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from django.db import transaction
+from idempotency.views import IdempotentCreateMixin
+from stitch_space_api.compact import CompactListMixin
+from stitch_space_api.fieldsets import SparseFieldsetViewMixin
+from stitch_space_api.filters import IdListFilter
+from stitch_space_api.pagination import LeaderboardCursorPagination
+from stitch_space_api.permissions import HasVisibleProfile
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django_filters.rest_framework import DjangoFilterBackend
 
 
-class ProfileListView(generics.ListAPIView):
+class ProfileListView(SparseFieldsetViewMixin, generics.ListAPIView):
     """
     API view to list profiles with annotations for followers, followed profiles
     and pieces counts. Supports ordering by any field using Django REST
-    Framework's OrderingFilter, with a default ordering by ID.
+    Framework's OrderingFilter, with a default ordering by ID, and fetching
+    a batch of profiles by id with `?ids=`.
     """
-    queryset = Profile.objects.annotate(
-        followed_count=Count("followed", distinct=True),
-        follower_count=Count("follower", distinct=True),
-        pieces_count=Count("creator", distinct=True),
-    )
     serializer_class = ProfileSerializer
-    filter_backends = [filters.OrderingFilter]
+    filter_backends = [IdListFilter, filters.OrderingFilter]
     ordering_fields = "__all__"
     ordering = ["id"]
 
+    def get_queryset(self):
+        # Each count is only computed when returned or sorted on
+        counts = {
+            "followed_count": Count("followed", distinct=True),
+            "follower_count": Count("follower", distinct=True),
+            "pieces_count": Count("creator", distinct=True),
+        }
+        return self.sparse_queryset(Profile.objects.annotate(**{
+            alias: count for alias, count in counts.items()
+            if self.reads_source(alias)
+        }).select_related("owner"))
+
+
+class LeaderboardView(SparseFieldsetViewMixin, generics.ListAPIView):
+    """
+    API view listing creators by the Bayesian average of the ratings of
+    their pieces, across all art types or for the one given in `art_type`.
+    Reads the rankings materialized by the refresh_leaderboard command,
+    with cursor pagination so every page is a range of the rankings index.
+    """
+    serializer_class = CreatorRankingSerializer
+    pagination_class = LeaderboardCursorPagination
+
+    def get_queryset(self):
+        art_type = self.request.query_params.get("art_type", "")
+        art_types = dict(Piece.ART_TYPES)
+        if art_type and art_type not in art_types:
+            raise ValidationError(
+                {"art_type": f"Must be one of {', '.join(art_types)}."}
+            )
+        return self.sparse_queryset(CreatorRanking.objects.filter(
+            art_type=art_type, profile__deleted_at__isnull=True
+        ).select_related("profile__owner"))
+
+
+class ProfileImportView(generics.GenericAPIView):
+    """
+    API view for administrators to register users in bulk. Accepts a list
+    of users (email, first and last name, and an optional password or
+    password hash), skips emails that are already registered and creates
+    the users and their profiles with chunked bulk inserts.
+    """
+    serializer_class = UserImportSerializer
+    permission_classes = [IsAdminUser]
+    max_users = 10000
+
+    def post(self, request, *args, **kwargs):
+        if len(request.data) > self.max_users:
+            return Response(
+                {"detail": f"Import at most {self.max_users} users at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        result = bulk_import_users(serializer.validated_data)
+        return Response(result, status=status.HTTP_201_CREATED)
+
 
 class ProfileRUDView(generics.RetrieveUpdateDestroyAPIView):
     """
     API view to retrieve, update, or delete a specific profile.
     Ensures only the owner of the profile can update or delete it.
     Annotates the profile with follower, followed, and pieces counts.
+    Deleting hides the profile and its pieces immediately; the
+    purge_deleted command removes them and their dependents later.
     """
     queryset = Profile.objects.annotate(
         followed_count=Count("followed", distinct=True),
@@ -66,15 +149,156 @@ class ProfileRUDView(generics.RetrieveUpdateDestroyAPIView):
         except Profile.DoesNotExist:
             raise Http404("Profile does not exist")
 
+    def perform_update(self, serializer):
+        # Save the profile and its change log entry together
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        instance.soft_delete()
+
+
+def count_subquery(queryset, field):
+    """
+    Return a correlated subquery counting the rows of `queryset`, which is
+    filtered on `field` against an OuterRef, or 0.
+    """
+    return Coalesce(Subquery(
+        queryset.order_by().values(field).annotate(
+            count=Count("id")
+        ).values("count")
+    ), 0)
 
-class FollowerListByProfileView(generics.ListAPIView):
+
+def profile_counts(profile):
+    """
+    Return the subqueries counting the follows of, follows by and pieces
+    of `profile`, an OuterRef, named as the annotations ProfileSerializer
+    reads.
+    """
+    return {
+        "followed_count": count_subquery(
+            Follower.objects.filter(followed_profile=profile),
+            "followed_profile"
+        ),
+        "follower_count": count_subquery(
+            Follower.objects.filter(follower=profile), "follower"
+        ),
+        "pieces_count": count_subquery(
+            Piece.all_objects.filter(profile=profile), "profile"
+        ),
+    }
+
+
+class FollowListMixin:
+    """
+    List view mixin for follower and following lists, which show the
+    profile named by `listed_profile` of each follow. The counts of the
+    listed profiles are read with correlated subqueries in the page query,
+    or in the query loading them in the compact format, and one more query
+    per page sets whether the current user follows each listed profile and
+    whether it follows them back.
+    """
+    serializer_class = FollowListSerializer
+    listed_profile = None
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        root = getattr(serializer, "child", serializer)
+        included = getattr(root, "included_serializers", {}).get("profiles")
+        if included is not None:
+            sources = {field.source for field in included.fields.values()}
+            included.get_included_queryset = lambda: (
+                Profile.all_objects.annotate(**{
+                    name: count
+                    for name, count in profile_counts(OuterRef("pk")).items()
+                    if name in sources
+                })
+            )
+        return serializer
+
+    def listed_profile_serializer(self):
+        for field in self.get_serializer().fields.values():
+            if (
+                field.source == self.listed_profile
+                and isinstance(field, ProfileSerializer)
+            ):
+                return field
+        return None
+
+    def with_listed_counts(self, queryset):
+        """
+        Annotate the follower, following and piece counts of the listed
+        profiles that the serialized profile fields read, as `listed_`
+        followed by the name of the annotation ProfileSerializer reads.
+        """
+        serializer = self.listed_profile_serializer()
+        if serializer is None:
+            return queryset
+        sources = {field.source for field in serializer.fields.values()}
+        return queryset.annotate(**{
+            f"listed_{name}": count
+            for name, count in profile_counts(
+                OuterRef(self.listed_profile)
+            ).items()
+            if name in sources
+        })
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            return page
+        counts = [
+            name for name in COUNT_SOURCES
+            if hasattr(page[0], f"listed_{name}")
+        ]
+        # The listed profiles are only selected when they are nested
+        if counts:
+            for follow in page:
+                profile = getattr(follow, self.listed_profile)
+                for name in counts:
+                    setattr(profile, name, getattr(follow, f"listed_{name}"))
+        fields = self.get_serializer().fields
+        if "isFollowedByMe" in fields or "followsMe" in fields:
+            self.set_follow_flags(page)
+        return page
+
+    def set_follow_flags(self, page):
+        """
+        Set `is_followed_by_me` and `follows_me` on each follow of the page
+        from the current user's follows of, and by, the listed profiles.
+        """
+        user = self.request.user
+        listed_ids = {
+            getattr(follow, f"{self.listed_profile}_id") for follow in page
+        }
+        followed_by_me, follows_me = set(), set()
+        for owner_id, follower_id, followed_id in Follower.objects.filter(
+            Q(follower__owner=user, followed_profile__in=listed_ids)
+            | Q(followed_profile__owner=user, follower__in=listed_ids)
+        ).values_list(
+            "follower__owner_id", "follower_id", "followed_profile_id"
+        ):
+            if owner_id == user.id:
+                followed_by_me.add(followed_id)
+            else:
+                follows_me.add(follower_id)
+        for follow in page:
+            listed_id = getattr(follow, f"{self.listed_profile}_id")
+            follow.is_followed_by_me = listed_id in followed_by_me
+            follow.follows_me = listed_id in follows_me
+
+
+class FollowerListByProfileView(FollowListMixin, CompactListMixin,
+                                SparseFieldsetViewMixin,
+                                generics.ListAPIView):
     """
     API view to list all followers of a specific profile.
     Supports filtering and ordering. Raises a 404 if the profile does not exist
     Passes the context to indicate this is a follower-only view.
     """
-    serializer_class = FollowerSerializer
     permission_classes = [IsAuthenticated]
+    listed_profile = "follower"
     lookup_field = "id"
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ["follower__owner_id"]
@@ -92,7 +316,11 @@ class FollowerListByProfileView(generics.ListAPIView):
             raise Http404("Profile does not exist")
 
         # Return the queryset of followers for the given profile
-        return Follower.objects.filter(followed_profile=profile)
+        return self.sparse_queryset(self.with_listed_counts(
+            Follower.objects.filter(
+                followed_profile=profile, follower__deleted_at__isnull=True
+            ).select_related("follower__owner")
+        ))
 
     def get_serializer_context(self):
         # Pass context to serializer to indicate this is a follower-only view
@@ -101,14 +329,16 @@ class FollowerListByProfileView(generics.ListAPIView):
         return context
 
 
-class FollowingListByProfileView(generics.ListAPIView):
+class FollowingListByProfileView(FollowListMixin, CompactListMixin,
+                                 SparseFieldsetViewMixin,
+                                 generics.ListAPIView):
     """
     API view to list all profiles that a specific profile is following.
     Supports ordering and raises a 404 if the profile does not exist.
     Passes the context to indicate this is a following-only view.
     """
-    serializer_class = FollowerSerializer
     permission_classes = [IsAuthenticated]
+    listed_profile = "followed_profile"
     lookup_field = "id"
     filter_backends = [filters.OrderingFilter]
     ordering_fields = "__all__"
@@ -125,7 +355,11 @@ class FollowingListByProfileView(generics.ListAPIView):
             raise Http404("Profile does not exist")
 
         # Return the queryset of profiles that the given profile is following
-        return Follower.objects.filter(follower=profile)
+        return self.sparse_queryset(self.with_listed_counts(
+            Follower.objects.filter(
+                follower=profile, followed_profile__deleted_at__isnull=True
+            ).select_related("followed_profile__owner")
+        ))
 
     def get_serializer_context(self):
         # Pass context to serializer to indicate this is a following-only view
@@ -134,16 +368,17 @@ class FollowingListByProfileView(generics.ListAPIView):
         return context
 
 
-class FollowerCreateView(generics.CreateAPIView):
+class FollowerCreateView(IdempotentCreateMixin, generics.CreateAPIView):
     """
     API view to list all profiles that a specific profile is following.
     Supports ordering and raises a 404 if the profile does not exist.
     Passes the context to indicate this is a following-only view.
+    Retries sent with the same `Idempotency-Key` get the first response.
     """
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasVisibleProfile]
     serializer_class = FollowerSerializer
 
-    def post(self, request, *args, **kwargs):
+    def create(self, request, *args, **kwargs):
         # Get the profile_id from the URL
         profile_id = self.kwargs.get("id")
 
@@ -169,19 +404,21 @@ class FollowerCreateView(generics.CreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Create a new Follower instance
-        Follower.objects.create(
-            follower=request.user.profile, followed_profile=followed_profile
-        )
-
-        # Create notification if the actor is not the recipient
-        if request.user.profile != followed_profile:
-            Notification.objects.create(
-                actor=request.user.profile,
-                recipient=followed_profile,
-                interaction_type="follow",
+        with transaction.atomic():
+            # Create a new Follower instance
+            Follower.objects.create(
+                follower=request.user.profile,
+                followed_profile=followed_profile
             )
 
+            # Create notification if the actor is not the recipient
+            if request.user.profile != followed_profile:
+                Notification.objects.create(
+                    actor=request.user.profile,
+                    recipient=followed_profile,
+                    interaction_type="follow",
+                )
+
         return Response(
             {"detail": "You are now following this profile."},
             status=status.HTTP_201_CREATED,
@@ -194,7 +431,7 @@ class FollowerDeleteView(generics.DestroyAPIView):
     Ensures the user is following the profile before deleting the follow
     relationship. Returns a 404 if the user is not following the profile.
     """
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasVisibleProfile]
     serializer_class = FollowerSerializer
 
     def delete(self, request, *args, **kwargs):
@@ -226,3 +463,131 @@ class FollowerDeleteView(generics.DestroyAPIView):
             {"detail": "You have unfollowed this profile."},
             status=status.HTTP_204_NO_CONTENT,
         )
+
+
+class ProfileExportView(generics.GenericAPIView):
+    """
+    API view to download all of a profile's data as newline-delimited JSON:
+    the profile, its pieces, the comments and ratings it has made and the
+    notifications it has received. Each line holds a `type` and the object
+    in the same shape as the matching API endpoint. Rows are read with
+    database cursors and streamed as they are serialized, so memory use
+    does not grow with the size of the export; under ASGI the chunks are
+    handed over through an async iterator. Add `?gzip=true` for a
+    gzip-compressed download. Only the owner can export a profile.
+    """
+    permission_classes = [IsAuthenticated]
+    chunk_size = 2000
+    buffer_size = 64 * 1024
+
+    def get(self, request, *args, **kwargs):
+        # Get the profile_id from the URL
+        profile_id = self.kwargs.get("id")
+
+        try:
+            profile = Profile.objects.annotate(
+                followed_count=Count("followed", distinct=True),
+                follower_count=Count("follower", distinct=True),
+                pieces_count=Count("creator", distinct=True),
+            ).select_related("owner").get(id=profile_id)
+        except Profile.DoesNotExist:
+            raise Http404("Profile does not exist")
+
+        if profile != request.user.profile:
+            raise PermissionDenied(
+                "You can only export your own profile."
+            )
+
+        compress = request.query_params.get("gzip") in ["1", "true"]
+        filename = f"stitch-space-profile-{profile.id}.ndjson"
+        content = self.stream(profile)
+        if compress:
+            content = self.compress(content)
+            filename += ".gz"
+        if isinstance(request._request, ASGIRequest):
+            # Django reads a sync iterator whole before sending any of it
+            # under ASGI
+            content = self.async_chunks(content)
+
+        response = StreamingHttpResponse(
+            content,
+            content_type=(
+                "application/gzip" if compress else "application/x-ndjson"
+            ),
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}"'
+        )
+        return response
+
+    def sections(self, profile):
+        """
+        Return the exported sections as (type, serializer, queryset) tuples.
+        """
+        context = self.get_serializer_context()
+        return [
+            ("piece", PieceSerializer(context=context),
+             Piece.objects.with_avg_rating()
+             .select_related("profile__owner")
+             .filter(profile=profile).order_by("id")),
+            ("comment", CommentSerializer(context=context),
+             Comment.objects.select_related("profile__owner")
+             .filter(profile=profile).order_by("id")),
+            ("rating", RatingSerializer(context=context),
+             Rating.objects.filter(profile=profile).order_by("id")),
+            ("notification", NotificationSerializer(context=context),
+             Notification.objects.select_related(
+                 "piece__profile__owner", "actor__owner", "recipient__owner"
+             ).filter(recipient=profile).order_by("id")),
+        ]
+
+    def stream(self, profile):
+        """
+        Yield the export as NDJSON, buffered into chunks of roughly
+        `buffer_size` bytes.
+        """
+        def lines():
+            yield self.line("profile", ProfileSerializer(profile).data)
+            for kind, serializer, queryset in self.sections(profile):
+                for obj in queryset.iterator(chunk_size=self.chunk_size):
+                    yield self.line(kind, serializer.to_representation(obj))
+
+        buffer = []
+        buffered = 0
+        for line in lines():
+            buffer.append(line)
+            buffered += len(line)
+            if buffered >= self.buffer_size:
+                yield b"".join(buffer)
+                buffer = []
+                buffered = 0
+        if buffer:
+            yield b"".join(buffer)
+
+    async def async_chunks(self, chunks):
+        """
+        Yield the chunks of a sync iterator as they are made, advancing it
+        on the request's thread, which holds the database cursors.
+        """
+        chunks = iter(chunks)
+        while True:
+            chunk = await sync_to_async(next)(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def line(self, kind, data):
+        return json.dumps(
+            {"type": kind, "data": data}, cls=JSONEncoder
+        ).encode() + b"\n"
+
+    def compress(self, chunks):
+        """
+        Gzip-compress a stream of chunks incrementally.
+        """
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
@@ -0,0 +1,428 @@
+"""
+In-process prefix index behind the typeahead endpoint. Each worker keeps
+creator names and piece titles in sorted arrays, built from the database
+on first use, and answers a prefix query with two binary searches.
+
+The index follows the database in three ways: saves and deletes of
+profiles, users and pieces made by this process are applied once they
+are committed; every few seconds the change log is read for the changes
+made by other processes, and for the follows and ratings that move the
+ranking; and once an hour it is rebuilt from scratch.
+"""
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from heapq import nlargest
+
+from changelog.models import ChangeLogEntry, log_position
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from pieces.models import Piece
+from profiles.models import Profile
+
+WORD = re.compile(r'\w+')
+
+PROFILE_FIELDS = (
+    'id', 'owner_id', 'owner__first_name', 'owner__last_name', 'image'
+)
+PIECE_FIELDS = (
+    'id', 'title', 'image', 'art_type', 'profile_id', 'rating_count',
+    'rating_total'
+)
+
+
+def normalize(text):
+    """
+    Fold case and accents, and reduce punctuation and whitespace to single
+    spaces, so that 'Crème  Brûlée!' and 'creme brulee' are the same key.
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(WORD.findall(text.casefold()))
+
+
+def word_keys(text, max_words=8):
+    """
+    Return the keys a name or title is indexed under: the text from each
+    of its first `max_words` words on, so a query matches from the start
+    of any word.
+    """
+    words = normalize(text).split()
+    return frozenset(
+        ' '.join(words[index:]) for index in range(min(len(words), max_words))
+    )
+
+
+class PrefixIndex:
+    """
+    Ids indexed under string keys, kept as one sorted list of (key, id)
+    pairs so the entries under a prefix are a contiguous slice. Searches
+    return the highest ranked ids of the slice. The top ids of prefixes
+    matching many entries, typically the first letter or two of a query,
+    are cached until an id under them changes.
+    """
+    # Prefixes matching more entries than this have their top ids cached
+    cache_threshold = 200
+
+    def __init__(self, size):
+        # Number of ids kept per cached prefix, the most a search returns
+        self.size = size
+        self.entries = []
+        self.keys = {}
+        self.ranks = {}
+        self.top = {}
+
+    def load(self, items):
+        """
+        Index (id, keys, rank) triples in bulk, sorting once.
+        """
+        for id, keys, rank in items:
+            self.keys[id] = keys
+            self.ranks[id] = rank
+            self.entries.extend((key, id) for key in keys)
+        self.entries.sort()
+
+    def set(self, id, keys, rank):
+        old_keys = self.keys.get(id, frozenset())
+        for key in old_keys - keys:
+            del self.entries[bisect_left(self.entries, (key, id))]
+        for key in keys - old_keys:
+            insort(self.entries, (key, id))
+        self.keys[id] = keys
+        self.ranks[id] = rank
+        self.forget(old_keys | keys)
+
+    def remove(self, id):
+        keys = self.keys.pop(id, None)
+        if keys is None:
+            return
+        del self.ranks[id]
+        for key in keys:
+            del self.entries[bisect_left(self.entries, (key, id))]
+        self.forget(keys)
+
+    def forget(self, keys):
+        """
+        Drop the cached top ids of every prefix of `keys`.
+        """
+        if not self.top:
+            return
+        for key in keys:
+            for end in range(1, len(key) + 1):
+                self.top.pop(key[:end], None)
+
+    def rank_key(self, id):
+        # Ties go to the oldest id, so results are stable
+        return (self.ranks[id], -id)
+
+    def search(self, prefix, limit):
+        top = self.top.get(prefix)
+        if top is None:
+            start = bisect_left(self.entries, (prefix,))
+            end = bisect_left(self.entries, (prefix + '\U0010ffff',), start)
+            ids = {id for _, id in self.entries[start:end]}
+            top = nlargest(self.size, ids, key=self.rank_key)
+            if end - start > self.cache_threshold:
+                self.top[prefix] = top
+        return top[:limit]
+
+
+class TypeaheadCatalog:
+    """
+    The indexed creators and pieces with the records returned for them.
+    Creators rank by follower count, pieces by average rating and then by
+    number of ratings.
+    """
+
+    def __init__(self, size):
+        self.profiles = PrefixIndex(size)
+        self.pieces = PrefixIndex(size)
+        self.profile_records = {}
+        self.piece_records = {}
+        self.owner_profiles = {}
+        self.profile_owners = {}
+
+    def profile_item(self, row):
+        followers = row.get('followed_count')
+        if followers is None:
+            # Saves of the profile don't change its followers
+            record = self.profile_records.get(row['id'])
+            followers = record['followers'] if record else 0
+        self.owner_profiles[row['owner_id']] = row['id']
+        self.profile_owners[row['id']] = row['owner_id']
+        self.profile_records[row['id']] = {
+            'id': row['id'],
+            'firstName': row['owner__first_name'],
+            'lastName': row['owner__last_name'],
+            'image': row['image'],
+            'followers': followers,
+        }
+        name = f"{row['owner__first_name']} {row['owner__last_name']}"
+        return row['id'], word_keys(name), followers
+
+    def piece_item(self, row):
+        count = row['rating_count']
+        average = row['rating_total'] / count if count else 0.0
+        self.piece_records[row['id']] = {
+            'id': row['id'],
+            'title': row['title'],
+            'image': row['image'],
+            'artType': row['art_type'],
+            'avgRating': average,
+            'profileId': row['profile_id'],
+        }
+        return row['id'], word_keys(row['title']), (average, count)
+
+    def load(self, profile_rows, piece_rows):
+        self.profiles.load(self.profile_item(row) for row in profile_rows)
+        self.pieces.load(self.piece_item(row) for row in piece_rows)
+
+    def set_profiles(self, ids, rows):
+        """
+        Index the profile rows and drop the other profiles in `ids`, which
+        no longer exist or are hidden.
+        """
+        for row in rows:
+            self.profiles.set(*self.profile_item(row))
+            ids.discard(row['id'])
+        for id in ids:
+            self.profiles.remove(id)
+            self.profile_records.pop(id, None)
+            owner_id = self.profile_owners.pop(id, None)
+            self.owner_profiles.pop(owner_id, None)
+
+    def set_pieces(self, ids, rows):
+        """
+        Index the piece rows and drop the other pieces in `ids`.
+        """
+        for row in rows:
+            self.pieces.set(*self.piece_item(row))
+            ids.discard(row['id'])
+        for id in ids:
+            self.pieces.remove(id)
+            self.piece_records.pop(id, None)
+
+    def rename_owner(self, owner_id, first_name, last_name):
+        profile_id = self.owner_profiles.get(owner_id)
+        if profile_id is not None:
+            self.profiles.set(*self.profile_item({
+                'id': profile_id,
+                'owner_id': owner_id,
+                'owner__first_name': first_name,
+                'owner__last_name': last_name,
+                'image': self.profile_records[profile_id]['image'],
+            }))
+
+    def search(self, prefix, limit):
+        profiles = [
+            self.profile_records[id]
+            for id in self.profiles.search(prefix, limit)
+        ]
+        pieces = []
+        for id in self.pieces.search(prefix, limit):
+            record = dict(self.piece_records[id])
+            creator = self.profile_records.get(record.pop('profileId'))
+            record['profile'] = creator and {
+                'id': creator['id'],
+                'firstName': creator['firstName'],
+                'lastName': creator['lastName'],
+            }
+            pieces.append(record)
+        return profiles, pieces
+
+
+def profile_rows(queryset):
+    return queryset.annotate(
+        followed_count=Count('followed')
+    ).values(*PROFILE_FIELDS, 'followed_count')
+
+
+def piece_rows(queryset):
+    return queryset.values(*PIECE_FIELDS)
+
+
+class TypeaheadIndex:
+    """
+    The per-process typeahead index and its synchronisation with the
+    database. Only the thread that builds the index for the first time
+    waits for it; while another thread syncs, requests are answered from
+    the index as it is.
+    """
+    max_results = 20
+    sync_interval = 2
+    rebuild_interval = 3600
+    # More pending changes than this are applied by rebuilding
+    sync_batch_size = 2000
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.refresh_lock = threading.Lock()
+        self.catalog = None
+        self.built_at = 0
+        self.synced_at = 0
+        # Change log position up to which changes are in the index
+        self.synced_position = 0
+
+    @property
+    def is_built(self):
+        return self.catalog is not None
+
+    def build(self):
+        # Changes committed while loading are applied again by the next sync
+        _, horizon = log_position()
+        catalog = TypeaheadCatalog(self.max_results)
+        catalog.load(
+            profile_rows(Profile.objects.all()).iterator(chunk_size=5000),
+            piece_rows(Piece.objects.all()).iterator(chunk_size=5000),
+        )
+        with self.lock:
+            self.catalog = catalog
+        self.synced_position = horizon
+        self.built_at = self.synced_at = time.monotonic()
+
+    def reset(self):
+        """
+        Drop the index, so the next search builds it again.
+        """
+        with self.lock:
+            self.catalog = None
+
+    def sync(self):
+        """
+        Apply the logged changes to pieces, profiles, ratings and follows
+        since the last sync, reloading the pieces and profiles they touch.
+        """
+        field, horizon = log_position()
+        entries = list(ChangeLogEntry.objects.filter(
+            kind__in=['piece', 'rating', 'follower', 'profile'],
+            **{f'{field}__gte': self.synced_position, f'{field}__lt': horizon}
+        ).values_list(
+            'kind', 'object_id', 'piece_id', 'target_profile_id'
+        )[:self.sync_batch_size + 1])
+        if len(entries) > self.sync_batch_size:
+            self.build()
+            return
+
+        piece_ids, profile_ids = set(), set()
+        for kind, object_id, piece_id, target_id in entries:
+            if kind == 'piece':
+                piece_ids.add(object_id)
+            elif kind == 'rating':
+                piece_ids.add(piece_id)
+            elif kind == 'follower':
+                profile_ids.add(target_id)
+            else:
+                profile_ids.add(object_id)
+
+        profiles = list(profile_rows(
+            Profile.objects.filter(id__in=profile_ids)
+        )) if profile_ids else []
+        pieces = list(piece_rows(
+            Piece.objects.filter(id__in=piece_ids)
+        )) if piece_ids else []
+        with self.lock:
+            self.catalog.set_profiles(profile_ids, profiles)
+            self.catalog.set_pieces(piece_ids, pieces)
+        self.synced_position = horizon
+        self.synced_at = time.monotonic()
+
+    def refresh(self):
+        """
+        Build, sync or rebuild the index when due.
+        """
+        if self.is_built and (
+            time.monotonic() - self.synced_at < self.sync_interval
+        ):
+            return
+        if not self.refresh_lock.acquire(blocking=not self.is_built):
+            return
+        try:
+            now = time.monotonic()
+            stale = now - self.built_at > self.rebuild_interval
+            if not self.is_built or stale:
+                self.build()
+            elif now - self.synced_at >= self.sync_interval:
+                self.sync()
+        finally:
+            self.refresh_lock.release()
+
+    def search(self, query, limit):
+        """
+        Return the top `limit` creators and pieces with a word of their
+        name or title starting with the query.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return [], []
+        self.refresh()
+        with self.lock:
+            return self.catalog.search(prefix, limit)
+
+    def apply(self, method, *args):
+        """
+        Apply a change from this process once it is committed. Changes are
+        skipped until the index is built, which then reads them anyway.
+        """
+        if not self.is_built:
+            return
+
+        def apply_change():
+            with self.lock:
+                getattr(self.catalog, method)(*args)
+
+        transaction.on_commit(apply_change)
+
+
+typeahead = TypeaheadIndex()
+
+
+def index_profile(sender, instance, raw=False, **kwargs):
+    if raw or not typeahead.is_built:
+        return
+    if instance.deleted_at is not None:
+        typeahead.apply('set_profiles', {instance.id}, [])
+        return
+    typeahead.apply('set_profiles', {instance.id}, [{
+        'id': instance.id,
+        'owner_id': instance.owner_id,
+        'owner__first_name': instance.owner.first_name,
+        'owner__last_name': instance.owner.last_name,
+        'image': instance.image,
+    }])
+
+
+def unindex_profile(sender, instance, **kwargs):
+    typeahead.apply('set_profiles', {instance.id}, [])
+
+
+def index_owner(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        # New users get indexed with the profile created for them
+        return
+    typeahead.apply(
+        'rename_owner', instance.id, instance.first_name, instance.last_name
+    )
+
+
+def index_piece(sender, instance, raw=False, **kwargs):
+    if raw or not typeahead.is_built:
+        return
+    rows = [] if instance.deleted_at is not None else [{
+        field: getattr(instance, field) for field in PIECE_FIELDS
+    }]
+    typeahead.apply('set_pieces', {instance.id}, rows)
+
+
+def unindex_piece(sender, instance, **kwargs):
+    typeahead.apply('set_pieces', {instance.id}, [])
+
+
+post_save.connect(index_profile, sender=Profile)
+post_delete.connect(unindex_profile, sender=Profile)
+post_save.connect(index_owner, sender=User)
+post_save.connect(index_piece, sender=Piece)
+post_delete.connect(unindex_piece, sender=Piece)
@@ -0,0 +1,31 @@
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from search.index import typeahead
+
+
+class TypeaheadView(generics.GenericAPIView):
+    """
+    API view for search-as-you-type. Returns the creators and pieces with
+    a word of their name or title starting with `q`, creators ranked by
+    followers and pieces by average rating. Results come from the
+    in-process typeahead index, so once it is built a request costs no
+    database queries beyond authentication and a periodic sync.
+    """
+    default_limit = 5
+
+    def get(self, request):
+        try:
+            limit = min(
+                int(request.query_params.get('limit', self.default_limit)),
+                typeahead.max_results
+            )
+        except ValueError:
+            raise ValidationError('limit must be an integer.')
+        if limit < 1:
+            raise ValidationError('limit must be positive.')
+
+        profiles, pieces = typeahead.search(
+            request.query_params.get('q', ''), limit
+        )
+        return Response({'profiles': profiles, 'pieces': pieces})
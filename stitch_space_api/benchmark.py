@@ -0,0 +1,162 @@
+"""
+Helpers for exercising every API route against the current database, used
+by the endpoint benchmark and query budget commands.
+"""
+import math
+from time import perf_counter
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from changelog.models import ChangeLogEntry, log_position
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver
+from rest_framework_simplejwt.tokens import AccessToken
+from pieces.models import Piece, Rating
+from profiles.models import Profile
+
+
+def api_routes():
+    """
+    Return the GET-able routes declared in stitch_space_api/urls.py,
+    skipping included URLconfs such as the admin and authentication ones,
+    and event streams, which never finish.
+    """
+    routes = []
+    for pattern in get_resolver().url_patterns:
+        if not isinstance(pattern, URLPattern):
+            continue
+        view_class = getattr(pattern.callback, 'view_class', None)
+        if view_class is not None and (
+            not hasattr(view_class, 'get')
+            or getattr(view_class, 'streaming', False)
+        ):
+            continue
+        routes.append(pattern)
+    return routes
+
+
+def sample_objects():
+    """
+    Pick representative rows to request: the profile following the most
+    others (so its feed is busy), the most rated piece and the position of
+    the oldest change log entry.
+    """
+    profile = Profile.objects.annotate(
+        following=Count('follower')
+    ).order_by('-following').first()
+    piece = Piece.objects.order_by('-rating_count').first()
+    rating = Rating.objects.filter(piece=piece).first()
+    field, horizon = log_position()
+    oldest = ChangeLogEntry.objects.order_by(field).values_list(
+        field, flat=True
+    ).first()
+    return {
+        'user': profile.owner if profile else None,
+        'profile': profile.id if profile else 0,
+        'owner': profile.owner_id if profile else 0,
+        'piece': piece.id if piece else 0,
+        'rating': rating.id if rating else 0,
+        'since': horizon if oldest is None else oldest,
+    }
+
+
+def route_path(pattern, samples):
+    """
+    Build a concrete path for a route, filling its id from the samples.
+    """
+    route = str(pattern.pattern)
+    if '<int:id>' not in route:
+        return f'/{route}'
+    if route.startswith('pieces/'):
+        value = samples['piece']
+    elif route.startswith('ratings/'):
+        value = samples['rating']
+    elif pattern.name == 'profile-rud':
+        # The profile detail route is looked up by the owner's user id
+        value = samples['owner']
+    else:
+        value = samples['profile']
+    return f"/{route.replace('<int:id>', str(value))}"
+
+
+def authenticated_client(user):
+    """
+    Return a test client logged in as the user, with both a session and a
+    JWT cookie so it works with either authentication setting.
+    """
+    client = Client(HTTP_HOST='localhost')
+    if user is not None:
+        client.force_login(user)
+        client.cookies[settings.REST_AUTH['JWT_AUTH_COOKIE']] = str(
+            AccessToken.for_user(user)
+        )
+    return client
+
+
+def response_body(response):
+    """
+    Return the full body of a test client response, consuming it when it
+    is streamed.
+    """
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def percentile(values, percent):
+    """
+    Return the nearest-rank percentile of a list of numbers.
+    """
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def benchmark_route(client, path, iterations, base_url=None):
+    """
+    Request a path repeatedly and return its latency percentiles in
+    milliseconds, queries per request and response size. Query counts are
+    only available when requests go through the in-process test client.
+    """
+    latencies = []
+    queries = None
+    status = size = None
+    for _ in range(iterations):
+        if base_url:
+            request = Request(base_url.rstrip('/') + path, headers={
+                'Cookie': '; '.join(
+                    f'{name}={morsel.value}'
+                    for name, morsel in client.cookies.items()
+                ),
+            })
+            start = perf_counter()
+            try:
+                with urlopen(request) as response:
+                    body = response.read()
+                    status = response.status
+            except HTTPError as error:
+                body = error.read()
+                status = error.code
+            latencies.append(perf_counter() - start)
+        else:
+            with CaptureQueriesContext(connection) as captured:
+                start = perf_counter()
+                response = client.get(path)
+                body = response_body(response)
+                latencies.append(perf_counter() - start)
+            status = response.status_code
+            queries = len(captured)
+        size = len(body)
+    return {
+        'path': path,
+        'status': status,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'queries': queries,
+        'bytes': size,
+    }
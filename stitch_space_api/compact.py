@@ -0,0 +1,125 @@
+"""
+Compact list format. Requested with `?format=compact` or the
+`application/vnd.stitchspace.compact+json` media type, list items refer to
+nested profiles and pieces by id and the response holds each of them once,
+in a top-level `included` map keyed by type and id and loaded with one
+query per type.
+"""
+from collections import defaultdict
+
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from stitch_space_api.fieldsets import trim_queryset
+
+
+class CompactJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.stitchspace.compact+json'
+    format = 'compact'
+
+
+def is_compact(request):
+    renderer = getattr(request, 'accepted_renderer', None)
+    return (
+        request.method == 'GET'
+        and renderer is not None
+        and renderer.format == CompactJSONRenderer.format
+    )
+
+
+def side_load(serializer, included):
+    """
+    Replace the nested objects of a serializer with their ids. Records on
+    the serializer the type each replaced field refers to, and in
+    `included` the nested serializer to use for each type.
+    """
+    serializer.side_loaded = {}
+    for name, field in list(serializer.fields.items()):
+        if not isinstance(field, serializers.ModelSerializer):
+            continue
+        key = str(field.Meta.model._meta.verbose_name_plural)
+        if key not in included:
+            included[key] = field
+            side_load(field, included)
+        serializer.fields[name] = serializers.PrimaryKeyRelatedField(
+            read_only=True,
+            **({'source': field.source} if field.source != name else {})
+        )
+        serializer.side_loaded[name] = key
+
+
+def included_queryset(serializer):
+    """
+    Return the queryset included objects of a serializer's model are read
+    from. Serializers can provide `get_included_queryset` to add the
+    annotations their fields read.
+    """
+    get_queryset = getattr(serializer, 'get_included_queryset', None)
+    if get_queryset is not None:
+        return get_queryset()
+    return serializer.Meta.model._base_manager.all()
+
+
+def build_included(serializer, items):
+    """
+    Load and serialize the objects the side-loaded `items` refer to,
+    including the ones those objects refer to in turn.
+    """
+    pending = defaultdict(set)
+
+    def collect(side_loaded, data):
+        for name, key in side_loaded.items():
+            if data.get(name) is not None:
+                pending[key].add(data[name])
+
+    for item in items:
+        collect(serializer.side_loaded, item)
+
+    included = {key: {} for key in serializer.included_serializers}
+    # Types are loaded in the order they were found, which is usually the
+    # order they refer to each other, so each is read once
+    while pending:
+        for key, nested in serializer.included_serializers.items():
+            ids = {
+                pk for pk in pending.pop(key, ())
+                if str(pk) not in included[key]
+            }
+            if not ids:
+                continue
+            queryset = trim_queryset(included_queryset(nested), nested)
+            for obj in queryset.filter(pk__in=ids):
+                data = nested.to_representation(obj)
+                included[key][str(obj.pk)] = data
+                collect(nested.side_loaded, data)
+    return included
+
+
+class CompactListMixin:
+    """
+    List view mixin serving the compact format. Must come before
+    `SparseFieldsetViewMixin`, whose queryset trimming then also drops
+    the joins to the side-loaded objects.
+    """
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES, CompactJSONRenderer
+    ]
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if is_compact(self.request):
+            root = getattr(serializer, 'child', serializer)
+            root.included_serializers = {}
+            side_load(root, root.included_serializers)
+        return serializer
+
+    def sparse_queryset(self, queryset):
+        if is_compact(self.request):
+            return trim_queryset(queryset, self.get_serializer())
+        return super().sparse_queryset(queryset)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        root = getattr(data.serializer, 'child', None)
+        if hasattr(root, 'included_serializers'):
+            response.data['included'] = build_included(root, data)
+        return response
@@ -0,0 +1,228 @@
+"""
+Synthetic dataset generation for reproducing production-scale behaviour
+locally. Rows are written with chunked `bulk_create`, which skips the
+model signals, so profiles are created directly and the piece counters
+are recomputed once at the end.
+"""
+import random
+import uuid
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from notifications.models import Notification
+from pieces.models import Piece, Comment, Rating, rebuild_art_type_stats
+from profiles.leaderboard import refresh_leaderboard
+from profiles.models import Profile, Follower
+
+FIRST_NAMES = (
+    'Ada', 'Bea', 'Cal', 'Dot', 'Eli', 'Fay', 'Gus', 'Hal', 'Ivy', 'Jo',
+    'Kit', 'Liv', 'Max', 'Nel', 'Oz', 'Pip', 'Quin', 'Ros', 'Sam', 'Tess',
+)
+LAST_NAMES = (
+    'Aran', 'Bobbin', 'Cable', 'Darn', 'Eyelet', 'Fairisle', 'Gauge',
+    'Hank', 'Intarsia', 'Jacquard', 'Knot', 'Loom', 'Mohair', 'Needle',
+)
+TITLE_WORDS = (
+    'Autumn', 'Blue', 'Cosy', 'Delicate', 'Evening', 'Forest', 'Garden',
+    'Harbour', 'Indigo', 'Meadow', 'Ocean', 'Spring', 'Winter', 'Wool',
+    'Shawl', 'Sweater', 'Blanket', 'Scarf', 'Sampler', 'Tapestry',
+)
+COMMENTS = (
+    'Beautiful work!', 'Love the colours.', 'What yarn did you use?',
+    'This is stunning.', 'Great stitch definition.', 'So inspiring!',
+)
+# Ratings lean towards the top of the 0-5 scale
+SCORE_WEIGHTS = (1, 2, 4, 10, 20, 15)
+
+
+def heavy_tailed(rng, mean, limit):
+    """
+    Draw a non-negative integer from a Pareto distribution (shape 2) scaled
+    to the given mean, capped at `limit`.
+    """
+    return min(limit, int(round(mean * (rng.paretovariate(2) - 1))))
+
+
+def bulk_insert(model, objects, chunk_size, after_chunk=None):
+    """
+    Insert the objects produced by an iterable in chunks. Each created chunk
+    is passed to `after_chunk` when given, so dependent rows can be written
+    without holding every instance in memory. Returns the number of rows.
+    """
+    created = 0
+    iterator = iter(objects)
+    while chunk := list(islice(iterator, chunk_size)):
+        chunk = model.objects.bulk_create(chunk)
+        if after_chunk:
+            after_chunk(chunk)
+        created += len(chunk)
+    return created
+
+
+def generate_dataset(users=1000, pieces_per_user=3, follows_per_user=20,
+                     ratings_per_piece=8, comments_per_piece=4,
+                     chunk_size=1000, seed=None, password='password123',
+                     log=None):
+    """
+    Generate users with profiles, a power-law follower graph, pieces across
+    all art types, ratings, comments and the matching notifications.
+    Returns the number of rows created per model.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    batch = uuid.uuid4().hex[:8]
+    password_hash = make_password(password)
+
+    def user_rows():
+        for index in range(users):
+            email = f'synthetic-{batch}-{index}@example.com'
+            yield User(
+                username=email,
+                email=email,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                password=password_hash,
+            )
+
+    counts = {model: 0 for model in (
+        'users', 'profiles', 'followers', 'pieces', 'ratings', 'comments',
+        'notifications',
+    )}
+    profile_ids = []
+    owners = {}
+
+    def create_profiles(chunk):
+        profiles = Profile.objects.bulk_create(
+            Profile(owner_id=user.id) for user in chunk
+        )
+        profile_ids.extend(profile.id for profile in profiles)
+        counts['profiles'] += len(profiles)
+
+    def notify(interaction_type):
+        def create_notifications(chunk):
+            notifications = Notification.objects.bulk_create(
+                Notification(
+                    piece_id=getattr(row, 'piece_id', None),
+                    actor_id=(
+                        row.follower_id if interaction_type == 'follow'
+                        else row.profile_id
+                    ),
+                    recipient_id=(
+                        row.followed_profile_id
+                        if interaction_type == 'follow'
+                        else owners[row.piece_id]
+                    ),
+                    interaction_type=interaction_type,
+                )
+                for row in chunk
+            )
+            counts['notifications'] += len(notifications)
+        return create_notifications
+
+    log(f'Creating {users} users and profiles')
+    counts['users'] = bulk_insert(
+        User, user_rows(), chunk_size, create_profiles
+    )
+
+    # Popularity follows a power law, so a few profiles collect most of the
+    # followers and ratings
+    popularity = list(accumulate(
+        1 / (rank + 1) ** 1.1 for rank in range(len(profile_ids))
+    ))
+    popular_ids = profile_ids[:]
+    rng.shuffle(popular_ids)
+
+    def follower_rows():
+        for follower_id in profile_ids:
+            count = heavy_tailed(rng, follows_per_user, len(profile_ids) - 1)
+            followed = set(rng.choices(
+                popular_ids, cum_weights=popularity, k=count
+            ))
+            followed.discard(follower_id)
+            for followed_id in followed:
+                yield Follower(
+                    follower_id=follower_id, followed_profile_id=followed_id
+                )
+
+    log('Creating the follower graph')
+    counts['followers'] = bulk_insert(
+        Follower, follower_rows(), chunk_size, notify('follow')
+    )
+
+    art_types = [art_type for art_type, _ in Piece.ART_TYPES]
+
+    def piece_rows():
+        for profile_id in profile_ids:
+            for _ in range(heavy_tailed(rng, pieces_per_user, 500)):
+                yield Piece(
+                    title=' '.join(rng.sample(TITLE_WORDS, 2)),
+                    image=f'https://picsum.photos/id/{rng.randint(1, 999)}'
+                          '/800/600',
+                    profile_id=profile_id,
+                    art_type=rng.choice(art_types),
+                    featured=rng.random() < 0.02,
+                )
+
+    def record_owners(chunk):
+        owners.update((piece.id, piece.profile_id) for piece in chunk)
+
+    log('Creating pieces')
+    counts['pieces'] = bulk_insert(
+        Piece, piece_rows(), chunk_size, record_owners
+    )
+
+    def interaction_rows(mean):
+        for piece_id, owner_id in owners.items():
+            count = heavy_tailed(rng, mean, len(profile_ids) - 1)
+            actors = set(rng.choices(
+                popular_ids, cum_weights=popularity, k=count
+            ))
+            actors.discard(owner_id)
+            for actor_id in actors:
+                yield piece_id, actor_id
+
+    log('Creating ratings')
+    counts['ratings'] = bulk_insert(
+        Rating,
+        (
+            Rating(
+                piece_id=piece_id,
+                profile_id=actor_id,
+                score=rng.choices(range(6), weights=SCORE_WEIGHTS)[0],
+            )
+            for piece_id, actor_id in interaction_rows(ratings_per_piece)
+        ),
+        chunk_size,
+        notify('rating'),
+    )
+
+    log('Creating comments')
+    counts['comments'] = bulk_insert(
+        Comment,
+        (
+            Comment(
+                piece_id=piece_id,
+                profile_id=actor_id,
+                content=rng.choice(COMMENTS),
+            )
+            for piece_id, actor_id in interaction_rows(comments_per_piece)
+        ),
+        chunk_size,
+        notify('comment'),
+    )
+
+    log('Recounting piece counters')
+    piece_ids = list(owners)
+    for start in range(0, len(piece_ids), chunk_size):
+        Piece.objects.filter(
+            id__in=piece_ids[start:start + chunk_size]
+        ).recount()
+
+    log('Rebuilding art type stats')
+    rebuild_art_type_stats()
+
+    log('Ranking creators')
+    refresh_leaderboard(full=True, batch_size=chunk_size)
+
+    return counts
@@ -0,0 +1,206 @@
+"""
+Sparse fieldsets. GET requests can pass `?fields=` to list the fields to
+return, or `?omit=` to list fields to leave out, as comma separated names
+with dots for the fields of nested objects, e.g.
+`?fields=id,title,profile.firstName`. Serializers using
+`SparseFieldsetMixin` drop the other fields before serializing, and views
+using `SparseFieldsetViewMixin` trim their querysets to the columns and
+joins the remaining fields read.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.pagination import CursorPagination
+
+
+def parse_field_paths(value):
+    """
+    Parse 'id,profile.firstName' into {'id': None, 'profile': {'firstName':
+    None}}, where None stands for the whole field.
+    """
+    tree = {}
+    for path in value.split(','):
+        names = [name for name in path.strip().split('.') if name]
+        node = tree
+        for name in names[:-1]:
+            child = node.setdefault(name, {})
+            if child is None:
+                # The whole field was already requested
+                break
+            node = child
+        else:
+            if names:
+                node[names[-1]] = None
+    return tree
+
+
+def requested_fieldsets(request):
+    """
+    Return the parsed `fields` and `omit` parameters of a request, each
+    None when absent.
+    """
+    params = getattr(request, 'query_params', request.GET)
+    only = params.get('fields')
+    omit = params.get('omit')
+    return (
+        parse_field_paths(only) if only else None,
+        parse_field_paths(omit) if omit else None,
+    )
+
+
+def prune_fields(serializer, only=None, omit=None):
+    """
+    Remove the fields of a serializer, and of its nested serializers, that
+    are not in `only` or that are in `omit`.
+    """
+    fields = serializer.fields
+    for name in list(fields):
+        if only is not None and name not in only:
+            del fields[name]
+            continue
+        if omit is not None and name in omit and omit[name] is None:
+            del fields[name]
+            continue
+        nested_only = only.get(name) if only is not None else None
+        nested_omit = omit.get(name) if omit is not None else None
+        if nested_only is None and nested_omit is None:
+            continue
+        nested = getattr(fields[name], 'child', fields[name])
+        if isinstance(nested, serializers.Serializer):
+            prune_fields(nested, nested_only, nested_omit)
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin applying the request's `fields` and `omit` parameters
+    to GET responses. Only the outermost serializer, the one given the
+    request in its context, reads the parameters.
+    """
+    # Model attributes read by each SerializerMethodField, used to trim
+    # querysets. A method field missing here keeps the queryset untrimmed.
+    method_field_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self._context.get('request')
+        if request is not None and request.method == 'GET':
+            only, omit = requested_fieldsets(request)
+            if only is not None or omit is not None:
+                prune_fields(self, only, omit)
+
+
+def add_source(model, prefix, attrs, columns, relations):
+    """
+    Add the column read through a dotted source, and the relations it
+    follows, to `columns` and `relations`. Returns False when the source
+    is a property or method, whose reads are unknown.
+    """
+    for index, attr in enumerate(attrs):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # Annotations are selected anyway and DRF skips read-only
+            # fields whose attribute is missing
+            return not hasattr(model, attr)
+        path = prefix + attr
+        columns.add(path)
+        if index == len(attrs) - 1:
+            return True
+        if not (field.many_to_one or (field.one_to_one and field.concrete)):
+            return False
+        relations.add(path)
+        model = field.related_model
+        prefix = path + '__'
+    return True
+
+
+def queryset_paths(serializer, model, columns, relations, prefix=''):
+    """
+    Collect the columns and forward relations that the fields of a
+    serializer read from its model. Returns False when they can't all be
+    determined.
+    """
+    method_sources = getattr(serializer, 'method_field_sources', {})
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.SerializerMethodField):
+            sources = method_sources.get(name)
+            if sources is None:
+                return False
+        elif isinstance(field, serializers.ListSerializer):
+            return False
+        elif isinstance(field, serializers.BaseSerializer):
+            try:
+                relation = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return False
+            if not relation.many_to_one and not relation.one_to_one:
+                return False
+            path = prefix + field.source
+            columns.add(path)
+            relations.add(path)
+            if not queryset_paths(
+                field, relation.related_model, columns, relations,
+                path + '__'
+            ):
+                return False
+            continue
+        elif field.source == '*':
+            return False
+        else:
+            sources = [field.source]
+        for source in sources:
+            if not add_source(
+                model, prefix, source.split('.'), columns, relations
+            ):
+                return False
+    return True
+
+
+def trim_queryset(queryset, serializer, columns=()):
+    """
+    Restrict a queryset to the columns and joins a serializer reads, plus
+    the given `columns`, or return it unchanged when those can't be
+    determined.
+    """
+    columns, relations = set(columns), set()
+    if not queryset_paths(serializer, queryset.model, columns, relations):
+        return queryset
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*relations)
+    return queryset.only(*columns)
+
+
+class SparseFieldsetViewMixin:
+    """
+    View mixin trimming querysets to the fields requested with `fields`
+    or `omit`, and telling which serializer sources will be read, so
+    annotations can be left out when nothing reads them.
+    """
+
+    def sparse_queryset(self, queryset):
+        if self.request.method != 'GET':
+            return queryset
+        only, omit = requested_fieldsets(self.request)
+        if only is None and omit is None:
+            return queryset
+        # Cursor pagination reads the ordering fields of the rows it
+        # returns to build the next cursor
+        ordering = ()
+        if isinstance(self.paginator, CursorPagination):
+            ordering = [
+                field.lstrip('-') for field in
+                self.paginator.get_ordering(self.request, queryset, self)
+            ]
+        return trim_queryset(queryset, self.get_serializer(), ordering)
+
+    def reads_source(self, source):
+        """
+        Return whether a top-level field reading `source` will be
+        serialized, or the request orders by it.
+        """
+        if source in self.request.query_params.get('ordering', ''):
+            return True
+        return any(
+            field.source == source
+            for field in self.get_serializer().fields.values()
+        )
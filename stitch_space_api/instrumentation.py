@@ -0,0 +1,133 @@
+"""
+Per-request performance instrumentation.
+
+Records the SQL query count, the time spent in the database, the time
+spent rendering the response and the total time for each sampled request.
+The figures are returned in a `Server-Timing` response header and written
+as one structured log line tagged with the resolved URL name.
+
+Only work done in the request's own thread before the response is
+returned is measured:
+
+- Queries are counted on the connections of the request's thread, so
+  those run by `sync_to_async(thread_sensitive=False)` calls, such as the
+  reads of the notification stream, or by background threads are missed.
+- Streamed bodies, such as the profile export and the notification
+  stream, are produced after the response leaves the middleware; their
+  queries and time are not included.
+- Rendering covers turning the response data into bytes, e.g. JSON
+  encoding. Building the data with the serializers happens in the view
+  and is part of the total only.
+"""
+import json
+import logging
+import random
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('stitch_space_api.performance')
+
+# Timings of the request being handled, or None when it is not sampled
+_current_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Accumulates the measurements for a single request.
+    """
+    __slots__ = ('query_count', 'db_time', 'render_time', 'render_start')
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.render_start = None
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting queries and timing their execution.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_time += perf_counter() - start
+        timings.query_count += 1
+
+
+class PerformanceInstrumentationMiddleware:
+    """
+    Middleware measuring sampled requests. The share of requests measured
+    is set by `PERFORMANCE_SAMPLE_RATE`; with a rate of 0 the middleware
+    removes itself from the stack when the server starts.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, 'PERFORMANCE_SAMPLE_RATE', 0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        total_time = perf_counter() - start
+
+        # See the module docstring for what these figures leave out
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timings.db_time * 1000:.2f};'
+            f'desc="{timings.query_count} queries"',
+            f'render;dur={timings.render_time * 1000:.2f}',
+            f'view;dur={total_time * 1000:.2f}',
+        ])
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        logger.info(json.dumps({
+            'url_name': resolver_match.url_name if resolver_match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timings.query_count,
+            'db_ms': round(timings.db_time * 1000, 2),
+            'render_ms': round(timings.render_time * 1000, 2),
+            'view_ms': round(total_time * 1000, 2),
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Time the rendering of DRF and template responses, which Django runs
+        right after this hook.
+        """
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.render_start = perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: self.rendered(timings)
+            )
+        return response
+
+    def rendered(self, timings):
+        timings.render_time += perf_counter() - timings.render_start
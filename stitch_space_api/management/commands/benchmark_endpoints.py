@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+from stitch_space_api.benchmark import (
+    api_routes, authenticated_client, benchmark_route, route_path,
+    sample_objects
+)
+
+
+class Command(BaseCommand):
+    """
+    Management command to benchmark every GET route in
+    stitch_space_api/urls.py against the current database.
+    """
+    help = (
+        'Request every API route repeatedly and report p50/p95/p99 latency, '
+        'queries per request and response size as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument(
+            '--warmup', type=int, default=2,
+            help='Unmeasured requests made to each route first.'
+        )
+        parser.add_argument(
+            '--base-url', default=None,
+            help=(
+                'Send requests to a running server (e.g. a local gunicorn '
+                'at http://127.0.0.1:8000) instead of the in-process test '
+                'client. Query counts are not reported in this mode.'
+            )
+        )
+        parser.add_argument(
+            '--route', action='append', default=[],
+            help='Only benchmark the named route (repeatable).'
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help='Write the JSON results to this file instead of stdout.'
+        )
+
+    def handle(self, *args, **options):
+        samples = sample_objects()
+        client = authenticated_client(samples['user'])
+        base_url = options['base_url']
+
+        results = []
+        for pattern in api_routes():
+            if options['route'] and pattern.name not in options['route']:
+                continue
+            path = route_path(pattern, samples)
+            if options['warmup']:
+                benchmark_route(client, path, options['warmup'], base_url)
+            result = benchmark_route(
+                client, path, options['iterations'], base_url
+            )
+            result['name'] = pattern.name
+            results.append(result)
+            self.stderr.write(
+                f"{pattern.name}: p50 {result['p50_ms']}ms, "
+                f"p95 {result['p95_ms']}ms, queries {result['queries']}"
+            )
+
+        report = json.dumps({
+            'createdAt': datetime.now(timezone.utc).isoformat(),
+            'baseUrl': base_url,
+            'iterations': options['iterations'],
+            'routes': results,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from stitch_space_api.querybudget import check_query_budgets
+
+
+class Command(BaseCommand):
+    """
+    Management command to check every API route against its query budget.
+    Runs against a throwaway test database and exits with an error listing
+    the offending SQL when a budget is exceeded, so it can fail a build.
+    """
+    help = (
+        'Check that every API route stays within its query budget and that '
+        'its query count does not grow with the data or page size.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Reuse the test database between runs.'
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, keepdb=options['keepdb']
+        )
+        try:
+            failures = check_query_budgets()
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+
+        if failures:
+            raise CommandError(
+                'Query budgets exceeded:\n' + '\n'.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS('All routes within budget.'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from stitch_space_api.dataset import generate_dataset
+
+
+class Command(BaseCommand):
+    """
+    Management command to generate a synthetic, production-shaped dataset
+    for local performance work.
+    """
+    help = (
+        'Generate users, profiles, a power-law follower graph, pieces, '
+        'ratings, comments and notifications using chunked bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--pieces-per-user', type=float, default=3)
+        parser.add_argument('--follows-per-user', type=float, default=20)
+        parser.add_argument('--ratings-per-piece', type=float, default=8)
+        parser.add_argument('--comments-per-piece', type=float, default=4)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Random seed, for reproducible datasets.'
+        )
+        parser.add_argument(
+            '--password', default='password123',
+            help='Password given to every generated user.'
+        )
+
+    def handle(self, *args, **options):
+        counts = generate_dataset(
+            users=options['users'],
+            pieces_per_user=options['pieces_per_user'],
+            follows_per_user=options['follows_per_user'],
+            ratings_per_piece=options['ratings_per_piece'],
+            comments_per_piece=options['comments_per_piece'],
+            chunk_size=options['chunk_size'],
+            seed=options['seed'],
+            password=options['password'],
+            log=self.stdout.write,
+        )
+        for model, count in counts.items():
+            self.stdout.write(f'{model}: {count}')
+        self.stdout.write(self.style.SUCCESS('Dataset generated.'))
@@ -0,0 +1,53 @@
+import json
+import subprocess
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from stitch_space_api.warmup import import_time_report, measure_import_times
+
+
+class Command(BaseCommand):
+    """
+    Management command to measure what starting the web application costs
+    in imports, so start-up time can be compared across releases.
+    """
+    help = (
+        'Start the application in a fresh interpreter with '
+        '`python -X importtime` and report the total start-up time and the '
+        'slowest modules and packages as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Number of modules and packages to list.'
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help='Write the JSON report to this file instead of stdout.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            modules, timings = measure_import_times()
+        except subprocess.CalledProcessError as error:
+            raise CommandError(
+                'The application failed to start:\n' + error.stderr[-2000:]
+            )
+        report = import_time_report(modules, options['top'])
+        self.stderr.write(
+            f"django.setup() {timings['setup'] * 1000:.0f}ms, "
+            f"application loaded {timings['total'] * 1000:.0f}ms, "
+            f"{report['modules']} modules"
+        )
+        report = json.dumps({
+            'createdAt': datetime.now(timezone.utc).isoformat(),
+            'setupMs': round(timings['setup'] * 1000, 1),
+            'totalMs': round(timings['total'] * 1000, 1),
+            **report,
+        }, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,102 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from notifications.models import Notification
+from pieces.models import Piece, Comment, Rating, deferred_counter_updates
+from profiles.models import Profile, Follower
+
+
+class Command(BaseCommand):
+    """
+    Management command to purge soft-deleted pieces and profiles. Their
+    dependent rows are deleted in bounded batches, each in its own short
+    transaction, and the counters of the pieces they touched are recounted
+    once per batch.
+    """
+    help = (
+        'Delete soft-deleted pieces and profiles and their comments, '
+        'ratings, followers and notifications in bounded batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches, to limit database load.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running as a worker, checking every --interval.'
+        )
+        parser.add_argument('--interval', type=float, default=60)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.pause = options['pause']
+        while True:
+            pieces, profiles = self.purge()
+            if pieces or profiles:
+                self.stdout.write(
+                    f'Purged {pieces} pieces and {profiles} profiles.'
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def purge(self):
+        """
+        Purge every soft-deleted piece, then every soft-deleted profile,
+        and return how many of each were removed.
+        """
+        piece_ids = list(Piece.all_objects.filter(
+            deleted_at__isnull=False
+        ).values_list('id', flat=True))
+        for piece_id in piece_ids:
+            self.delete_in_batches(Notification.objects.filter(
+                piece_id=piece_id
+            ))
+            self.delete_in_batches(Rating.objects.filter(piece_id=piece_id))
+            self.delete_in_batches(Comment.objects.filter(piece_id=piece_id))
+            Piece.all_objects.filter(id=piece_id).delete()
+
+        profile_ids = list(Profile.all_objects.filter(
+            deleted_at__isnull=False
+        ).values_list('id', flat=True))
+        for profile_id in profile_ids:
+            self.delete_in_batches(Notification.objects.filter(
+                Q(actor_id=profile_id) | Q(recipient_id=profile_id)
+            ))
+            self.delete_in_batches(Rating.objects.filter(
+                profile_id=profile_id
+            ))
+            self.delete_in_batches(Comment.objects.filter(
+                profile_id=profile_id
+            ))
+            self.delete_in_batches(Follower.objects.filter(
+                Q(follower_id=profile_id) | Q(followed_profile_id=profile_id)
+            ))
+            Profile.all_objects.filter(id=profile_id).delete()
+
+        return len(piece_ids), len(profile_ids)
+
+    def delete_in_batches(self, queryset):
+        """
+        Delete the rows of a queryset `batch_size` at a time. Counter
+        updates are deferred so each batch costs one recount of the pieces
+        it touched instead of one update per row.
+        """
+        model = queryset.model
+        while True:
+            ids = list(
+                queryset.order_by().values_list('id', flat=True)[
+                    :self.batch_size
+                ]
+            )
+            if not ids:
+                return
+            with transaction.atomic(), deferred_counter_updates():
+                model._base_manager.filter(id__in=ids).delete()
+            if self.pause:
+                time.sleep(self.pause)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from pieces.models import rebuild_art_type_stats
+
+
+class Command(BaseCommand):
+    """
+    Management command to recompute the per art type rollup behind
+    `pieces/stats/` from the pieces table, after bulk writes that skip the
+    signal handlers keeping it up to date.
+    """
+    help = 'Recompute the art type stats rollup from the pieces table.'
+
+    def handle(self, *args, **options):
+        rebuild_art_type_stats()
+        self.stdout.write('Rebuilt art type stats.')
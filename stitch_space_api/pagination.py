@@ -1,4 +1,9 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 from urllib.parse import urlparse, parse_qs
 
@@ -27,3 +32,36 @@ class PageNumberOnlyPagination(PageNumberPagination):
             'previousPage': get_page_number(self.get_previous_link()),
             'results': data
         })
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists over large tables. On PostgreSQL it
+    takes the planner's row estimate for the queryset, and only runs the
+    exact COUNT(*) when the estimate is below `estimate_threshold`, where
+    counting is cheap and page counts stay accurate.
+    """
+    estimate_threshold = 50000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connections[queryset.db].vendor == 'postgresql':
+            plan = json.loads(queryset.explain(format='json'))
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+
+class LeaderboardCursorPagination(CursorPagination):
+    """
+    Cursor pagination for the creator leaderboard, highest score first.
+    Each page continues from the last score of the previous one, so deep
+    pages cost the same index range scan as the first and no count is
+    run.
+    """
+    ordering = ('-score', '-rating_count', 'id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,15 @@
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+
+
+class HasVisibleProfile(BasePermission):
+    """
+    Deny writes from users whose profile has been deleted. Default managers
+    hide deleted profiles, but `request.user.profile` still reaches them,
+    so views writing on behalf of the user's profile check it here.
+    """
+    message = "Your profile has been deleted."
+
+    def has_permission(self, request, view):
+        if request.method in SAFE_METHODS or not request.user.is_authenticated:
+            return True
+        return request.user.profile.deleted_at is None
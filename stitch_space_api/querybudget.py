@@ -0,0 +1,204 @@
+"""
+Query budgets for the API routes. Every GET route in
+stitch_space_api/urls.py has a maximum number of SQL queries per request,
+authentication included, and that number must not grow with the amount
+of data or the page size. Routes without a budget fail the check, so new
+routes have to declare one.
+"""
+import math
+from contextlib import contextmanager
+
+from changelog.models import record_changes
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from pieces.models import Piece
+from search.index import typeahead
+from stitch_space_api.benchmark import (
+    api_routes, authenticated_client, response_body, route_path,
+    sample_objects
+)
+from stitch_space_api.dataset import generate_dataset
+
+QUERY_BUDGETS = {
+    'profile-list': 4,
+    'profile-rud': 4,
+    'profile-leaderboard': 3,
+    'profile-export': 8,
+    'profile-followers-list': 6,
+    'profile-following-list': 6,
+    'profile-notifications-list': 5,
+    'piece-list': 5,
+    'piece-feed': 5,
+    'piece-stats': 3,
+    'piece-rud': 3,
+    'comment-list': 4,
+    'rating-list': 4,
+    'rating-detail': 3,
+    'piece-ratings': 4,
+    'piece-rating-summary': 3,
+    'change-list': 6,
+    'search-typeahead': 2,
+}
+
+# Query strings some routes are also measured with, and their budgets.
+# Sparse fieldsets and the compact format change which columns, joins and
+# annotations a list reads, so they can bring back per-row queries. The
+# compact format adds one query per side-loaded type. The change list and
+# the typeahead search return early without `since` and `q`, so they are
+# also measured with them.
+QUERY_VARIANTS = {
+    'profile-list': {'fields=id,firstName': 4},
+    'profile-leaderboard': {'fields=id,profile.firstName': 3},
+    'profile-notifications-list': {
+        'fields=id,actor.firstName': 5,
+        'format=compact': 7,
+    },
+    'piece-list': {
+        'fields=id,profile.firstName': 4,
+        'format=compact': 6,
+    },
+    'piece-feed': {
+        'fields=id,profile.firstName': 4,
+        'format=compact': 6,
+    },
+    'comment-list': {
+        'fields=id,profile.firstName': 4,
+        'format=compact': 5,
+    },
+    'rating-list': {'fields=id,score': 4},
+    'change-list': {'since={since}': 6},
+    'search-typeahead': {'q=a': 5},
+    'profile-followers-list': {
+        'fields=id,followerProfile.firstName': 6,
+        'format=compact': 7,
+    },
+    'profile-following-list': {
+        'fields=id,followedProfile.firstName': 6,
+        'format=compact': 7,
+    },
+}
+
+# Number of generated users for the small and the large dataset
+DATASET_SIZES = (8, 32)
+PAGE_SIZES = (2, 1000)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a block runs more queries than its budget. The message
+    lists every query that was run.
+    """
+
+    def __init__(self, label, budget, queries):
+        self.queries = queries
+        lines = [
+            f'{label}: {len(queries)} queries run, budget is {budget}'
+        ]
+        lines.extend(
+            f'  {number}. {query["sql"]}'
+            for number, query in enumerate(queries, start=1)
+        )
+        super().__init__('\n'.join(lines))
+
+
+@contextmanager
+def assert_max_queries(budget, label='block'):
+    """
+    Context manager failing with the offending SQL when the block runs
+    more than `budget` queries.
+    """
+    with CaptureQueriesContext(connection) as captured:
+        yield captured
+    if len(captured) > budget:
+        raise QueryBudgetExceeded(label, budget, captured.captured_queries)
+
+
+def route_variants(name):
+    """
+    Return the query strings a route is measured with and their budgets,
+    the empty string standing for the route without extra parameters.
+    Query strings are formatted with the sample objects.
+    """
+    return {'': QUERY_BUDGETS.get(name), **QUERY_VARIANTS.get(name, {})}
+
+
+def measure_routes(users, page_size, failures):
+    """
+    Generate a dataset of the given size inside a transaction that is
+    rolled back, request every route and its variants with the given page
+    size and return the number of queries per route name and variant.
+    Routes over budget or not answering with a 2xx status are added to
+    `failures`. The typeahead index is dropped before and after, so each
+    run measures a search building it from the dataset and no index of
+    rolled back rows is left behind.
+    """
+    label = f'{users} users, page size {page_size}'
+    counts = {}
+    with transaction.atomic():
+        generate_dataset(
+            users=users, pieces_per_user=3, follows_per_user=users // 2,
+            ratings_per_piece=users // 2, comments_per_piece=users // 2,
+            seed=users,
+        )
+        # The dataset is bulk inserted without change log entries, so log
+        # an update of every piece for the change list to read
+        record_changes('piece', Piece.objects.all(), 'updated')
+        typeahead.reset()
+        samples = sample_objects()
+        client = authenticated_client(samples['user'])
+        for pattern in api_routes():
+            for variant, budget in route_variants(pattern.name).items():
+                route = f'{pattern.name}?{variant}' if variant else (
+                    pattern.name
+                )
+                path = f'{route_path(pattern, samples)}?page_size={page_size}'
+                if variant:
+                    path += f'&{variant.format(**samples)}'
+                try:
+                    with assert_max_queries(
+                        math.inf if budget is None else budget,
+                        f'{route} ({label})'
+                    ) as captured:
+                        response = client.get(path)
+                        response_body(response)
+                except QueryBudgetExceeded as error:
+                    failures.append(str(error))
+                if not 200 <= response.status_code < 300:
+                    failures.append(
+                        f'{route} ({label}): status {response.status_code}'
+                    )
+                    continue
+                counts[pattern.name, variant] = len(captured)
+        transaction.set_rollback(True)
+    typeahead.reset()
+    return counts
+
+
+def check_query_budgets():
+    """
+    Measure every route at each dataset and page size and return a list of
+    failure messages, empty when all routes are within budget.
+    """
+    failures = []
+    runs = [
+        measure_routes(users, page_size, failures)
+        for users in DATASET_SIZES
+        for page_size in PAGE_SIZES
+    ]
+    for pattern in api_routes():
+        name = pattern.name
+        if name not in QUERY_BUDGETS:
+            failures.append(f'{name}: no query budget declared')
+            continue
+        for variant in route_variants(name):
+            route = f'{name}?{variant}' if variant else name
+            counts = {
+                measured[name, variant] for measured in runs
+                if (name, variant) in measured
+            }
+            if len(counts) > 1:
+                failures.append(
+                    f'{route}: query count varies with data or page size '
+                    f'({", ".join(str(count) for count in sorted(counts))})'
+                )
+    return failures
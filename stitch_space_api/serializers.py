@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from dj_rest_auth.registration.serializers import RegisterSerializer
 
@@ -8,6 +9,7 @@ class CustomRegisterSerializer(RegisterSerializer):
     RegisterSerializer. Adds 'first_name' and 'last_name' fields to
     the registration process and overrides `get_cleaned_data` to
     include these fields in the cleaned data returned after validation.
+    Saving runs in a single transaction.
     """
     first_name = serializers.CharField()
     last_name = serializers.CharField()
@@ -21,4 +23,9 @@ class CustomRegisterSerializer(RegisterSerializer):
             'email': self.validated_data.get('email', ''),
             'first_name': self.validated_data.get('first_name', ''),
             'last_name': self.validated_data.get('last_name', '')
-        }
\ No newline at end of file
+        }
+
+    def save(self, request):
+        # Create the user, its profile and its email address together
+        with transaction.atomic():
+            return super().save(request)
@@ -18,6 +18,7 @@ import re
 if os.path.isfile("env.py"):
     import env
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +45,13 @@ REST_FRAMEWORK = {
         "stitch_space_api.pagination.PageNumberOnlyPagination"
     ),
     "PAGE_SIZE": 100,
+    # Used by stitch_space_api.throttling.TokenBucketThrottle on the
+    # endpoints clients poll
+    "DEFAULT_THROTTLE_RATES": {
+        "feed": "60/min",
+        "notifications": "60/min",
+        "piece-list": "120/min",
+    },
 }
 if "DEV" not in os.environ:
     REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
@@ -96,6 +104,10 @@ CORS_ALLOWED_ORIGIN_REGEXES = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Create endpoints accept an Idempotency-Key header to make retries safe
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -114,12 +126,17 @@ INSTALLED_APPS = [
     "dj_rest_auth.registration",
     "corsheaders",
     "django_filters",
+    "stitch_space_api",
     "profiles",
     "notifications",
     "pieces",
+    "changelog",
+    "search",
+    "idempotency",
 ]
 
 MIDDLEWARE = [
+    "stitch_space_api.instrumentation.PerformanceInstrumentationMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -131,6 +148,25 @@ MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+# Share of requests measured by the performance instrumentation middleware
+# (Server-Timing header and timing log line). 0 disables it entirely.
+PERFORMANCE_SAMPLE_RATE = float(os.environ.get("PERFORMANCE_SAMPLE_RATE", 0))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "stitch_space_api.performance": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 ROOT_URLCONF = "stitch_space_api.urls"
 
 TEMPLATES = [
@@ -167,6 +203,19 @@ else:
         )
     }
 
+# Cache
+# Profile cards and the throttle counters need a cache shared by every
+# worker process. Set REDIS_URL to use Redis; without it each process
+# keeps its own local-memory cache, profile cards are turned off and rate
+# limits are counted per worker.
+if "REDIS_URL" in os.environ:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("REDIS_URL"),
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
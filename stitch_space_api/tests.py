@@ -0,0 +1,15 @@
+from django.test import TestCase
+from stitch_space_api.querybudget import check_query_budgets
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Runs the query budget check of every API route as part of the test
+    suite, so `manage.py test` fails when a route goes over its budget.
+    """
+
+    def test_query_budgets(self):
+        failures = check_query_budgets()
+        self.assertFalse(
+            failures, 'Query budgets exceeded:\n' + '\n'.join(failures)
+        )
@@ -0,0 +1,165 @@
+"""
+Token bucket throttling held in process memory. Each user (or anonymous
+client address) gets one bucket per view scope. Checking a request only
+touches the in-process bucket; each bucket is reconciled with the shared
+cache every few seconds so usage in other worker processes is accounted
+for without a cache round trip on every request. That needs the shared
+cache configured by REDIS_URL; with the local-memory default each worker
+process counts its own requests only.
+"""
+import threading
+from time import monotonic, time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucket:
+    """
+    Token bucket state for one user and scope.
+    """
+    __slots__ = ('tokens', 'duration', 'updated', 'synced', 'window',
+                 'spent', 'own', 'others_seen')
+
+    def __init__(self, capacity, duration, now):
+        self.tokens = float(capacity)
+        # Period of the scope's rate, after which an idle bucket is full
+        self.duration = duration
+        self.updated = now
+        self.synced = now
+        self.window = None
+        # Requests allowed here since the last sync, requests from here
+        # already added to the shared counter for `window`, and requests
+        # from other processes already taken out of `tokens`
+        self.spent = 0
+        self.own = 0
+        self.others_seen = 0
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle for views declaring a `throttle_scope`, with the rate taken
+    from DEFAULT_THROTTLE_RATES (e.g. '120/min'). Bursts of up to the full
+    rate are allowed and tokens refill continuously.
+    """
+    reconcile_interval = 5
+    sweep_interval = 60
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s_%(window)s'
+    durations = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+    # Shared by every instance in the process; DRF creates a throttle
+    # instance per request
+    buckets = {}
+    lock = threading.Lock()
+    last_sweep = 0.0
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        capacity, duration = self.parse_rate(rate)
+        refill_rate = capacity / duration
+
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        key = (scope, ident)
+        now = monotonic()
+
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(
+                    capacity, duration, now
+                )
+            bucket.tokens = min(
+                capacity,
+                bucket.tokens + (now - bucket.updated) * refill_rate
+            )
+            bucket.updated = now
+            allowed = bucket.tokens >= 1
+            if allowed:
+                bucket.tokens -= 1
+                bucket.spent += 1
+            needs_sync = now - bucket.synced >= self.reconcile_interval
+            if needs_sync:
+                bucket.synced = now
+            self.wait_time = (
+                None if allowed else (1 - bucket.tokens) / refill_rate
+            )
+
+        if needs_sync:
+            self.reconcile(scope, ident, bucket, duration)
+            self.sweep(now)
+        return allowed
+
+    def wait(self):
+        return getattr(self, 'wait_time', None)
+
+    def parse_rate(self, rate):
+        """
+        Return the number of requests and the period in seconds of a rate
+        such as '120/min'.
+        """
+        num, period = rate.split('/')
+        return int(num), self.durations[period[0]]
+
+    def reconcile(self, scope, ident, bucket, duration):
+        """
+        Add this process's recent usage to the shared counter for the
+        current window and take the usage of other processes out of the
+        local bucket. Needs a cache shared between workers to have effect.
+        """
+        window = int(time() // duration)
+        key = self.cache_format % {
+            'scope': scope, 'ident': ident, 'window': window
+        }
+        with self.lock:
+            if bucket.window != window:
+                bucket.window = window
+                bucket.own = 0
+                bucket.others_seen = 0
+            pending = bucket.spent
+            bucket.spent = 0
+            bucket.own += pending
+            own = bucket.own
+
+        cache.add(key, 0, timeout=duration * 2)
+        try:
+            total = cache.incr(key, pending) if pending else cache.get(key, 0)
+        except ValueError:
+            # The key was evicted between add() and incr(). Seed it again
+            # with this process's usage in the window, or keep the usage
+            # for the next reconcile when another process got there first.
+            if not cache.add(key, own, timeout=duration * 2):
+                with self.lock:
+                    if bucket.window == window:
+                        bucket.spent += pending
+                        bucket.own -= pending
+            return
+        others = max(0, total - own)
+
+        with self.lock:
+            if bucket.window == window and others > bucket.others_seen:
+                bucket.tokens = max(
+                    0.0, bucket.tokens - (others - bucket.others_seen)
+                )
+                bucket.others_seen = others
+
+    def sweep(self, now):
+        """
+        Drop buckets idle for a whole period of their scope's rate, which
+        are full again anyway.
+        """
+        if now - TokenBucketThrottle.last_sweep < self.sweep_interval:
+            return
+        with self.lock:
+            TokenBucketThrottle.last_sweep = now
+            for key in [
+                key for key, bucket in self.buckets.items()
+                if now - bucket.updated > bucket.duration
+            ]:
+                del self.buckets[key]
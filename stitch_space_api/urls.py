@@ -16,15 +16,21 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
+from changelog.views import ChangeListView
 from profiles.views import (
     ProfileListView, ProfileRUDView, FollowerListByProfileView,
-    FollowingListByProfileView, FollowerCreateView, FollowerDeleteView
+    FollowingListByProfileView, FollowerCreateView, FollowerDeleteView,
+    ProfileExportView, ProfileImportView, LeaderboardView
+)
+from notifications.views import (
+    NotificationListByProfileView, NotificationStreamView
 )
-from notifications.views import NotificationListByProfileView
 from pieces.views import (
     PieceFeedListView, PieceListView, CommentListCreateView, RatingListView,
-    PieceCreateView, PieceRUDView, RatingRUDView, PieceRatingListCreateView
+    PieceCreateView, PieceRUDView, RatingRUDView, PieceRatingListCreateView,
+    PieceRatingSummaryView, PieceRatingUpsertView, PieceStatsView
 )
+from search.views import TypeaheadView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -36,7 +42,20 @@ urlpatterns = [
 
     # Profiles
     path('profiles/', ProfileListView.as_view(), name='profile-list'),
+    path(
+        'profiles/import/', ProfileImportView.as_view(), name='profile-import'
+    ),
+    path(
+        'profiles/leaderboard/',
+        LeaderboardView.as_view(),
+        name='profile-leaderboard'
+    ),
     path('profile/<int:id>/', ProfileRUDView.as_view(), name='profile-rud'),
+    path(
+        'profile/<int:id>/export/',
+        ProfileExportView.as_view(),
+        name='profile-export'
+    ),
 
     # Followers
     path(
@@ -66,11 +85,17 @@ urlpatterns = [
         NotificationListByProfileView.as_view(),
         name='profile-notifications-list'
     ),
+    path(
+        'profile/<int:id>/notifications/stream/',
+        NotificationStreamView.as_view(),
+        name='profile-notifications-stream'
+    ),
 
     # Pieces
     path('pieces/', PieceListView.as_view(), name='piece-list'),
     path('pieces/create/', PieceCreateView.as_view(), name='piece-create'),
-    path('pieces/feed/', PieceFeedListView.as_view(), name='piece-list'),
+    path('pieces/feed/', PieceFeedListView.as_view(), name='piece-feed'),
+    path('pieces/stats/', PieceStatsView.as_view(), name='piece-stats'),
     path('pieces/<int:id>/', PieceRUDView.as_view(), name='piece-rud'),
     path(
         'pieces/<int:id>/comments/',
@@ -90,6 +115,24 @@ urlpatterns = [
         PieceRatingListCreateView.as_view(),
         name='piece-ratings'
     ),
+    path(
+        'pieces/<int:id>/rating/',
+        PieceRatingUpsertView.as_view(),
+        name='piece-rating-upsert'
+    ),
+    path(
+        'pieces/<int:id>/ratings/summary/',
+        PieceRatingSummaryView.as_view(),
+        name='piece-rating-summary'
+    ),
+
+    # Search
+    path(
+        'search/typeahead/', TypeaheadView.as_view(), name='search-typeahead'
+    ),
+
+    # Change log
+    path('changes/', ChangeListView.as_view(), name='change-list'),
 
     # Accounts
     path("accounts/", include("allauth.urls")),
@@ -0,0 +1,167 @@
+"""
+Start-up warmup and import cost measurement. `warm_up` does the work the
+first requests to a fresh worker would otherwise pay for: importing every
+app's views and serializers, compiling the URL patterns and filling the
+content type and typeahead caches. Serializer fields are not built ahead,
+as DRF builds them again for every serializer instance.
+
+gunicorn.conf.py runs it in the master once the app is preloaded, so
+forked workers start with all of it in memory they share copy-on-write.
+"""
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from time import perf_counter
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils.module_loading import autodiscover_modules
+
+IMPORT_TIME_LINE = re.compile(
+    r'^import time:\s+(\d+) \|\s+(\d+) \| +(\S+)$'
+)
+
+# Run with `python -X importtime` to measure what the web process imports
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+from stitch_space_api.warmup import import_app_modules
+from stitch_space_api.asgi import application
+import_app_modules()
+print(json.dumps({
+    'setup': setup, 'total': time.perf_counter() - start
+}))
+"""
+
+
+def import_app_modules():
+    """
+    Import the URL conf, and with it every view, and the serializer modules
+    of every installed app, which would otherwise be imported on the first
+    request.
+    """
+    get_resolver().url_patterns
+    autodiscover_modules('serializers')
+
+
+def compile_url_patterns():
+    """
+    Compile the regular expression of every URL pattern and build the
+    reverse lookup tables. Returns the number of patterns.
+    """
+    resolver = get_resolver()
+
+    def compile_patterns(patterns):
+        count = 0
+        for pattern in patterns:
+            pattern.pattern.regex
+            if isinstance(pattern, URLResolver):
+                count += compile_patterns(pattern.url_patterns)
+            else:
+                count += 1
+        return count
+
+    count = compile_patterns(resolver.url_patterns)
+    resolver.reverse_dict
+    return count
+
+
+def prime_caches(typeahead=True):
+    """
+    Fill the content type cache in one query and, when `typeahead` is set,
+    build the in-memory typeahead index.
+    """
+    ContentType.objects.get_for_models(*apps.get_models())
+    if typeahead:
+        from search.index import typeahead as index
+        index.refresh()
+
+
+def warm_up(typeahead=True):
+    """
+    Run every warmup step and return the seconds each took. Database
+    connections opened on the way are closed, so a process forked
+    afterwards never shares one with its parent.
+    """
+    timings = {}
+    steps = [
+        ('imports', import_app_modules),
+        ('urls', compile_url_patterns),
+        ('caches', lambda: prime_caches(typeahead)),
+    ]
+    try:
+        for name, step in steps:
+            start = perf_counter()
+            step()
+            timings[name] = perf_counter() - start
+    finally:
+        connections.close_all()
+    return timings
+
+
+def parse_import_times(output):
+    """
+    Parse `-X importtime` output into (module, self, cumulative) tuples,
+    with times in microseconds.
+    """
+    modules = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure_import_times():
+    """
+    Start the web application in a fresh interpreter with import timing
+    on. Returns the per-module timings and the interpreter's own report of
+    the seconds spent in `django.setup()` and in total.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+    )
+    return (
+        parse_import_times(result.stderr),
+        json.loads(result.stdout.strip().splitlines()[-1]),
+    )
+
+
+def import_time_report(modules, top=20):
+    """
+    Summarize import timings: the total, the slowest modules by their own
+    time and the slowest top-level packages by the time of all their
+    modules, in milliseconds.
+    """
+    packages = defaultdict(int)
+    for module, self_us, _ in modules:
+        packages[module.split('.')[0]] += self_us
+    slowest = sorted(modules, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        'modules': len(modules),
+        'importMs': round(sum(row[1] for row in modules) / 1000, 1),
+        'slowestModules': [
+            {
+                'module': module,
+                'selfMs': round(self_us / 1000, 1),
+                'cumulativeMs': round(cumulative_us / 1000, 1),
+            }
+            for module, self_us, cumulative_us in slowest
+        ],
+        'slowestPackages': [
+            {'package': package, 'ms': round(self_us / 1000, 1)}
+            for package, self_us in sorted(
+                packages.items(), key=lambda item: item[1], reverse=True
+            )[:top]
+        ],
+    }